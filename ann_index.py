@@ -0,0 +1,177 @@
+import json
+import os
+
+import numpy as np
+
+# --- APPROXIMATE NEAREST NEIGHBOUR INDEX ---
+# Two interchangeable backends over the same normalized vectors:
+#   IVFIndex   pure NumPy inverted file (k-means coarse quantizer), tuned with nprobe
+#   HNSWIndex  optional hnswlib graph, tuned with ef
+# Both expose search(query_vec, k, mask=None) -> (ids, scores) sorted by score.
+# Below ANN_MIN_ROWS the build is skipped and the engine scans exactly.
+
+ANN_MIN_ROWS = 200000
+INDEX_META_FILE = 'ann_meta.json'
+
+
+def _kmeans(vectors, nlist, iterations=10, sample_size=100000, seed=0):
+    # Spherical k-means on a sample; vectors are unit length so dot product = cosine
+    rng = np.random.default_rng(seed)
+    sample = vectors
+    if len(vectors) > sample_size:
+        sample = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+    sample = np.asarray(sample, dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        counts = np.bincount(assign, minlength=nlist)
+        empty = counts == 0
+        # Re-seed empty clusters with random sample points
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = sums / norms
+    return centroids.astype(np.float32)
+
+
+def _assign(vectors, centroids, block=65536):
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), block):
+        chunk = np.asarray(vectors[start:start + block], dtype=np.float32)
+        assign[start:start + block] = np.argmax(chunk @ centroids.T, axis=1)
+    return assign
+
+
+class IVFIndex:
+    kind = 'ivf'
+
+    def __init__(self, vectors, centroids, list_ids, list_offsets, nprobe=32):
+        self.vectors = vectors
+        self.centroids = centroids
+        self.list_ids = list_ids          # row ids grouped by cluster
+        self.list_offsets = list_offsets  # cluster c owns list_ids[offsets[c]:offsets[c + 1]]
+        self.nprobe = nprobe
+
+    @classmethod
+    def build(cls, vectors, nlist=None, nprobe=32, iterations=10):
+        if nlist is None:
+            nlist = int(min(65536, max(16, 4 * np.sqrt(len(vectors)))))
+        centroids = _kmeans(vectors, nlist, iterations=iterations)
+        assign = _assign(vectors, centroids)
+        list_ids = np.argsort(assign, kind='stable').astype(np.int64)
+        list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))]).astype(np.int64)
+        return cls(vectors, centroids, list_ids, list_offsets, nprobe=nprobe)
+
+    def candidates(self, query_vec, nprobe=None):
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        probe = np.argpartition(-(self.centroids @ query_vec), nprobe - 1)[:nprobe]
+        return np.concatenate([self.list_ids[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probe])
+
+    def search(self, query_vec, k=15, mask=None, nprobe=None, widen=1.0):
+        # widen: probe that many times more lists (SearchEngine: 1 / filter selectivity)
+        ids = self.candidates(query_vec, int(np.ceil((nprobe or self.nprobe) * widen)))
+        if mask is not None:
+            ids = ids[mask[ids]]
+        ids.sort()  # sequential reads from the (memory-mapped) matrix
+        scores = np.asarray(self.vectors[ids], dtype=np.float32) @ query_vec
+        k = min(k, len(ids))
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(ids) else np.arange(len(ids))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return ids[top], scores[top]
+
+    def save(self, store_dir):
+        np.save(os.path.join(store_dir, 'ivf_centroids.npy'), self.centroids)
+        np.save(os.path.join(store_dir, 'ivf_list_ids.npy'), self.list_ids)
+        np.save(os.path.join(store_dir, 'ivf_list_offsets.npy'), self.list_offsets)
+        return {'kind': self.kind, 'nlist': len(self.centroids), 'nprobe': self.nprobe}
+
+    @classmethod
+    def load(cls, store_dir, vectors, meta):
+        return cls(
+            vectors,
+            np.load(os.path.join(store_dir, 'ivf_centroids.npy')),
+            np.load(os.path.join(store_dir, 'ivf_list_ids.npy'), mmap_mode='r'),
+            np.load(os.path.join(store_dir, 'ivf_list_offsets.npy')),
+            nprobe=meta.get('nprobe', 32),
+        )
+
+
+class HNSWIndex:
+    kind = 'hnsw'
+
+    def __init__(self, graph, ef=64):
+        self.graph = graph
+        self.ef = ef
+        self.graph.set_ef(ef)
+
+    @classmethod
+    def build(cls, vectors, M=32, ef_construction=200, ef=64, block=65536):
+        import hnswlib
+        graph = hnswlib.Index(space='ip', dim=vectors.shape[1])
+        graph.init_index(max_elements=len(vectors), M=M, ef_construction=ef_construction)
+        for start in range(0, len(vectors), block):
+            chunk = np.asarray(vectors[start:start + block], dtype=np.float32)
+            graph.add_items(chunk, np.arange(start, start + len(chunk)))
+        return cls(graph, ef=ef)
+
+    def search(self, query_vec, k=15, mask=None, ef=None, widen=1.0):
+        # widen: scale ef (SearchEngine: 1 / filter selectivity), capped at the graph size
+        ef = min(int(np.ceil((ef or self.ef) * widen)), self.graph.get_current_count())
+        self.graph.set_ef(max(ef, k))
+        k = min(k, self.graph.get_current_count())
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        kwargs = {}
+        if mask is not None:
+            k = min(k, int(np.count_nonzero(mask)))
+            if k == 0:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            kwargs['filter'] = lambda i: bool(mask[i])
+        try:
+            labels, distances = self.graph.knn_query(query_vec, k=k, **kwargs)
+        except RuntimeError:
+            # hnswlib raises instead of returning fewer than k hits when the filter
+            # leaves too few reachable rows: a short result makes the caller scan exactly
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        # 'ip' space returns 1 - inner product
+        return labels[0].astype(np.int64), (1.0 - distances[0]).astype(np.float32)
+
+    def save(self, store_dir):
+        self.graph.save_index(os.path.join(store_dir, 'hnsw.bin'))
+        return {'kind': self.kind, 'ef': self.ef}
+
+    @classmethod
+    def load(cls, store_dir, vectors, meta):
+        import hnswlib
+        graph = hnswlib.Index(space='ip', dim=vectors.shape[1])
+        graph.load_index(os.path.join(store_dir, 'hnsw.bin'), max_elements=len(vectors))
+        return cls(graph, ef=meta.get('ef', 64))
+
+
+INDEX_TYPES = {IVFIndex.kind: IVFIndex, HNSWIndex.kind: HNSWIndex}
+
+
+def build_index(vectors, kind='ivf', **params):
+    return INDEX_TYPES[kind].build(vectors, **params)
+
+
+def save_index(index, store_dir):
+    meta = index.save(store_dir)
+    with open(os.path.join(store_dir, INDEX_META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def load_index(store_dir, vectors):
+    # Returns None when the store has no ANN index (small corpus -> exact search)
+    meta_path = os.path.join(store_dir, INDEX_META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    return INDEX_TYPES[meta['kind']].load(store_dir, vectors, meta)
@@ -1,8 +1,18 @@
 import streamlit as st
-import pandas as pd
-import pickle
-import re
-from sentence_transformers import SentenceTransformer, util
+import logging
+import os
+import numpy as np
+from engine import ScentEngine
+from cards import RENDER_MODES, card_html, grid_html, stylesheet_inline, stylesheet_link
+from metrics import StageTimer, start_metrics_server
+
+logger = logging.getLogger("scentsational")
+
+# "grid" (default): linked stylesheet + one HTML block per page of results.
+# "cards": inline stylesheet every rerun + one st.markdown per card.
+RENDER_MODE = os.environ.get("SCENT_RENDER_MODE", "grid")
+if RENDER_MODE not in RENDER_MODES:
+    RENDER_MODE = "grid"
 
 # --- 1. CONFIGURATION ---
 st.set_page_config(
@@ -13,332 +23,99 @@ st.set_page_config(
 )
 
 # --- 2. LUXURY CSS (THE ATELIER TWIN + COMPACT MOBILE) ---
-st.markdown("""
-    <style>
-    /* IMPORT FONTS */
-    @import url('https://fonts.googleapis.com/css2?family=Cormorant+Garamond:ital,wght@0,300;0,400;0,600;1,400&family=Montserrat:wght@300;400;500;600;700&display=swap');
-
-    /* GLOBAL STYLES */
-    html, body, [class*="css"], .stMarkdown, div, span, p {
-        font-family: 'Montserrat', sans-serif !important;
-        font-weight: 400 !important; 
-        color: #E0E0E0 !important;
-        font-size: 0.95rem !important;
-    }
-
-    /* BACKGROUND */
-    .stApp {
-        background-color: #050505;
-        background-image: radial-gradient(circle at 50% 0%, #1a1a1a 0%, #000000 100%);
-    }
-
-    /* HIDE SYSTEM ELEMENTS */
-    header {visibility: hidden;}
-    footer {visibility: hidden;}
-    .stTextInput label {display: none;}
-
-    /* --- TYPOGRAPHY --- */
-    h1 {
-        font-family: 'Cormorant Garamond', serif !important;
-        font-weight: 300 !important;
-        background: linear-gradient(to bottom, #D4AF37 0%, #F0E68C 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        text-align: center;
-        font-size: clamp(2.2rem, 6vw, 4rem) !important; 
-        text-transform: uppercase;
-        letter-spacing: clamp(2px, 1vw, 6px);
-        margin: 0;
-        padding-top: 10px;
-    }
-    
-    .sub-header {
-        font-family: 'Montserrat', sans-serif !important;
-        color: #888;
-        font-size: 0.75rem !important;
-        letter-spacing: 3px;
-        text-transform: uppercase;
-        margin-bottom: 20px;
-        text-align: center;
-    }
-
-    /* INTRO TEXT */
-    .intro-text {
-        font-family: 'Cormorant Garamond', serif !important;
-        font-style: italic;
-        font-size: clamp(1.2rem, 3vw, 1.5rem) !important;
-        color: #D4AF37 !important;
-        text-align: center;
-        max-width: 800px;
-        margin: 0 auto 10px auto;
-        line-height: 1.5;
-        padding: 0 15px;
-    }
-    
-    .intro-hint {
-        color: #666 !important;
-        font-size: 0.8rem !important;
-        text-align: center;
-        margin-bottom: 30px;
-        font-style: italic;
-    }
-
-    /* --- SIDEBAR COMPACTING --- */
-    section[data-testid="stSidebar"] {
-        background-color: #080808 !important;
-        border-right: 1px solid rgba(212, 175, 55, 0.15);
-    }
-    section[data-testid="stSidebar"] .block-container {
-        padding-top: 2rem !important;
-        padding-bottom: 1rem !important;
-    }
-    section[data-testid="stSidebar"] .stElementContainer {
-        margin-bottom: 0.5rem !important;
-    }
-    
-    .stSelectbox div[data-baseweb="select"] > div {
-        border: 1px solid rgba(212, 175, 55, 0.4) !important;
-        background-color: rgba(10, 10, 10, 0.8) !important;
-        color: #fff !important;
-        min-height: 38px !important;
-    }
-    .stSelectbox label { 
-        display: block !important; 
-        color: #D4AF37 !important; 
-        font-size: 0.65rem !important;
-        text-transform: uppercase; 
-        letter-spacing: 1px;
-        margin-bottom: 2px !important;
-    }
-    
-    /* --- FIX: FORCE BLACK BACKGROUND ON DROPDOWNS & POPOVERS --- */
-    div[data-baseweb="popover"],
-    div[data-baseweb="popover"] > div,
-    div[data-baseweb="menu"],
-    div[data-baseweb="select"] > div {
-        background-color: #0E0E0E !important;
-        color: #E0E0E0 !important;
-        border-color: #333 !important;
-    }
-    
-    /* Dropdown Options Text Color */
-    li[role="option"] {
-        background-color: #0E0E0E !important;
-        color: #E0E0E0 !important;
-    }
-    
-    /* Hover/Selected State (Gold Highlight) */
-    li[role="option"]:hover, li[role="option"][aria-selected="true"] {
-        background-color: #1a1a1a !important;
-        color: #D4AF37 !important;
-    }
-
-    /* --- SEARCH INPUT --- */
-    .stTextInput > div > div > input {
-        background-color: rgba(15, 15, 15, 0.8);
-        color: #FFF !important; 
-        border: 1px solid rgba(212, 175, 55, 0.5);
-        text-align: center;
-        padding: 18px 20px;
-        font-family: 'Cormorant Garamond', serif !important;
-        font-size: 1.3rem !important;
-        font-style: italic;
-        border-radius: 4px;
-    }
-    .stTextInput > div > div > input:focus {
-        border-color: #D4AF37;
-        box-shadow: 0 0 20px rgba(212, 175, 55, 0.2);
-        background-color: rgba(20, 20, 20, 1);
-    }
-    ::placeholder { color: #666 !important; opacity: 1; }
-
-    /* --- PERFUME CARD STYLING --- */
-    .perfume-card {
-        border: 1px solid rgba(212, 175, 55, 0.15);
-        background: rgba(12, 12, 12, 0.8);
-        padding: 25px;
-        margin-bottom: 20px;
-        text-align: center;
-        box-shadow: 0 10px 30px rgba(0,0,0,0.5);
-        border-radius: 4px;
-        height: 100%;
-        display: flex;
-        flex-direction: column;
-        justify-content: space-between;
-        align-items: center;
-        transition: transform 0.3s ease;
-        backdrop-filter: blur(10px);
-        position: relative;
-    }
-    .perfume-card:hover {
-        transform: translateY(-5px);
-        border-color: rgba(212, 175, 55, 0.5);
-        background: rgba(15, 15, 15, 0.9);
-    }
+# Styles live in static/scentsational.css. The grid render mode links it (the
+# browser fetches it once and caches it); the cards mode inlines it on every rerun.
+def inject_styles(mode):
+    if mode == "grid":
+        st.markdown(stylesheet_link(), unsafe_allow_html=True)
+    else:
+        st.markdown(stylesheet_inline(), unsafe_allow_html=True)
 
-    /* EMBLEM */
-    .brand-emblem {
-        width: 40px;
-        height: 40px;
-        border-radius: 50%;
-        border: 1px solid #D4AF37;
-        color: #D4AF37;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-family: 'Montserrat', sans-serif;
-        font-size: 0.8rem;
-        font-weight: bold;
-        margin: 0 auto 15px auto;
-        background: rgba(212, 175, 55, 0.05);
-        letter-spacing: 0;
-        text-transform: uppercase;
-    }
+inject_styles(RENDER_MODE)
 
-    .row-brand { 
-        font-family: 'Montserrat', sans-serif !important;
-        font-size: 0.9rem !important; 
-        font-weight: 600 !important; 
-        letter-spacing: 2px; 
-        color: #D4AF37 !important; 
-        margin-bottom: 5px; 
-        text-transform: uppercase;
-    }
-    .row-name { 
-        font-family: 'Cormorant Garamond', serif !important; 
-        font-size: 1.4rem !important; 
-        color: #fff !important; 
-        margin-bottom: 5px; 
-        font-style: italic; 
-    }
-    .row-meta {
-        font-size: 0.65rem !important;
-        color: #888 !important;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-        margin-bottom: 15px;
-        border-bottom: 1px solid #222;
-        padding-bottom: 10px;
-        display: inline-block;
-        width: 80%;
-    }
-    .row-rating {
-        color: #D4AF37;
-        font-weight: bold;
-        font-size: 1rem;
-        margin-bottom: 10px;
-    }
-    .row-notes {
-        font-family: 'Cormorant Garamond', serif !important;
-        font-size: 0.9rem !important;
-        color: #AAA !important;
-        font-style: italic;
-        margin-bottom: 15px;
-        line-height: 1.4;
-    }
-    
-    /* MATCH BAR CSS */
-    .match-wrapper { width: 100%; margin-bottom: 15px; padding: 0 10px; }
-    .match-header { display: flex; justify-content: space-between; font-size: 0.6rem !important; color: #888; text-transform: uppercase; letter-spacing: 1px; margin-bottom: 4px; }
-    .bar-bg { width: 100%; height: 2px; background-color: #333; border-radius: 1px; }
-    .bar-fill { height: 100%; background-color: #D4AF37; border-radius: 1px; box-shadow: 0 0 8px rgba(212, 175, 55, 0.6); }
-    .match-explain { font-size: 0.55rem !important; color: #555 !important; text-align: center; margin-top: 5px; font-style: italic; }
+# --- 3. LOGIC & DATA CLEANING ---
+@st.cache_resource
+def configure_logging():
+    # Streamlit leaves the root logger unconfigured: send our INFO lines (search
+    # timings, cache counters, startup) to stderr, once per process
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
 
-    /* BUTTON */
-    a.gold-btn {
-        text-decoration: none; color: #000 !important; background: #D4AF37; padding: 12px 25px; 
-        font-size: 0.75rem !important; font-weight: 600 !important; letter-spacing: 1px; 
-        border-radius: 2px; display: inline-block; font-family: 'Montserrat', sans-serif !important;
-        transition: 0.3s; text-transform: uppercase; width: 100%;
-    }
-    a.gold-btn:hover { background: #F0E68C; box-shadow: 0 0 15px rgba(212, 175, 55, 0.4); }
-    
-    /* FOOTER */
-    .custom-footer {
-        text-align: center; color: #444; font-size: 0.6rem !important; margin-top: 80px; 
-        padding-top: 20px; border-top: 1px solid #111; letter-spacing: 0.5px; opacity: 0.7;
-    }
-    .custom-footer a { color: #555 !important; text-decoration: none; }
-    .custom-footer a:hover { color: #777 !important; }
-    </style>
-    """, unsafe_allow_html=True)
+@st.cache_resource
+def start_metrics():
+    # Optional Prometheus endpoint (GET /metrics) on a side port, once per process
+    port = os.environ.get("SCENT_METRICS_PORT")
+    return start_metrics_server(int(port)) if port else None
 
-# --- 3. LOGIC & DATA CLEANING ---
 @st.cache_resource
 def load_data():
     try:
-        df = pd.read_csv('scentsational_data.csv', sep=None, engine='python', encoding='latin1')
-        df.columns = df.columns.str.strip()
-        
-        # MAPPING
-        cols = df.columns.tolist()
-        brand_col = next((c for c in cols if 'brand' in c.lower()), 'Brand')
-        name_col = next((c for c in cols if 'perfume' in c.lower() or 'name' in c.lower()), 'Name')
-        rating_col = next((c for c in cols if 'rating' in c.lower()), 'Rating Value')
-        gender_col = next((c for c in cols if 'gender' in c.lower()), 'Gender')
-        year_col = next((c for c in cols if 'year' in c.lower() or 'date' in c.lower() or 'launch' in c.lower()), 'Year')
-
-        df = df.rename(columns={
-            brand_col: 'Brand', name_col: 'Name',
-            rating_col: 'Rating Value', gender_col: 'Gender', year_col: 'Year'
-        })
-        
-        # Combine Notes
-        accord_cols = ['mainaccord1', 'mainaccord2', 'mainaccord3', 'mainaccord4', 'mainaccord5']
-        existing_accords = [c for c in accord_cols if c in df.columns]
-        if existing_accords:
-             df['Main Accords'] = df[existing_accords].apply(lambda x: ', '.join(x.dropna().astype(str)), axis=1)
-        else:
-             notes_col = next((c for c in cols if 'accord' in c.lower() or 'note' in c.lower()), 'Main Accords')
-             df = df.rename(columns={notes_col: 'Main Accords'})
-        
-        # Clean Data
-        df['Rating Value'] = df['Rating Value'].astype(str).str.replace(',', '.')
-        df['Rating Value'] = pd.to_numeric(df['Rating Value'], errors='coerce').fillna(0)
-        
-        def clean_str(x): return str(x).replace('-', ' ').title() if pd.notna(x) else ""
-        df['Brand'] = df['Brand'].apply(clean_str)
-        df['Name'] = df['Name'].apply(clean_str)
-        
-        if 'Gender' not in df.columns: df['Gender'] = "Unisex"
-        else: df['Gender'] = df['Gender'].fillna("Unisex")
-        
-        if 'Year' in df.columns:
-            df['Year'] = pd.to_numeric(df['Year'], errors='coerce').fillna(0).astype(int)
-            df['Year'] = df['Year'].apply(lambda x: str(x) if x > 1000 else "")
-        else:
-            df['Year'] = ""
-            
-        if 'Main Accords' not in df.columns: df['Main Accords'] = "Notes Unavailable"
-        
-        with open('scent_embeddings.pkl', 'rb') as f:
-            embeddings = pickle.load(f)
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        
-        return df, embeddings, model
+        return ScentEngine.load()
     except Exception as e:
         st.error(f"System Error: {e}")
-        return None, None, None
+        return None
 
-def get_initials(text):
-    if not text: return "SC"
-    words = str(text).split()
-    if not words: return "SC"
-    if len(words) == 1:
-        return words[0][:2].upper()
-    return (words[0][0] + words[-1][0]).upper()
+def render_cards(ids, scores):
+    if RENDER_MODE == "grid":
+        # One delta for the whole page of cards
+        st.markdown(grid_html(df, ids, scores), unsafe_allow_html=True)
+        return
 
-df, embeddings, model = load_data()
+    col1, col2, col3 = st.columns([1,1,1])
+    cols = [col1, col2, col3]
+    
+    # Rows are fetched one card at a time, so cards stream in as they are built
+    for i, (idx, raw_score) in enumerate(zip(ids, scores)):
+        with cols[i % 3]:
+            st.markdown(card_html(df.iloc[int(idx)], idx, raw_score), unsafe_allow_html=True)
+
+# PAGINATION: the first search keeps only the ranked ids + scores in session
+# state; "Load more" moves a cursor over them and never re-encodes or re-searches.
+# One list per session, replaced when the query or filters change:
+# at most MAX_RESULTS x (int32 + float32) = 960 bytes per session.
+PAGE_SIZE = 15
+MAX_RESULTS = 120
+
+def ranked_results(key, fetch):
+    page = st.session_state.get("ranked")
+    if page is None or page["key"] != key:
+        ids, scores = fetch()
+        page = {
+            "key": key,
+            "ids": np.asarray(ids, dtype=np.int32)[:MAX_RESULTS],
+            "scores": np.asarray(scores, dtype=np.float32)[:MAX_RESULTS],
+            "cursor": PAGE_SIZE,
+        }
+        st.session_state["ranked"] = page
+    return page
+
+def load_more():
+    st.session_state["ranked"]["cursor"] += PAGE_SIZE
+
+def render_page(page):
+    cursor = min(page["cursor"], len(page["ids"]))
+    render_cards(page["ids"][:cursor], page["scores"][:cursor])
+    if cursor < len(page["ids"]):
+        st.button(f"Load More  ·  {cursor} of {len(page['ids'])}", on_click=load_more, key="load_more")
+    return cursor
+
+configure_logging()
+start_metrics()
+engine = load_data()
+df = engine.df if engine is not None else None
+filters = engine.filters if engine is not None else None
 
 # --- 4. SIDEBAR ---
 with st.sidebar:
     st.markdown("<p style='color:#D4AF37; font-size:0.7rem; font-weight:bold; letter-spacing:2px; text-align:center; margin-bottom:5px;'>SETTINGS</p>", unsafe_allow_html=True)
     
-    # 1. GENDER
+    # 1. GENDER (facets are precomputed once in the FilterIndex)
     gender_option = "All"
     if df is not None:
-        genders = ["All"] + sorted([g for g in df['Gender'].astype(str).unique() if g != 'nan'])
-        gender_option = st.selectbox("Gender", genders)
+        gender_option = st.selectbox("Gender", filters.genders)
     
     # 2. RATING FILTER (SIMPLIFIED & REORDERED)
     rating_options = {
@@ -356,13 +133,8 @@ with st.sidebar:
     
     # 3. NOTES
     note_search = "All Notes"
-    if df is not None:
-         all_notes = ','.join(df['Main Accords'].astype(str)).replace('nan','').split(',')
-         all_notes = [n.strip().title() for n in all_notes if len(n)>2]
-         if all_notes:
-            top_notes = pd.Series(all_notes).value_counts().head(50).index.tolist()
-            top_notes.sort()
-            note_search = st.selectbox("Dominant Note", ["All Notes"] + top_notes)
+    if df is not None and filters.top_notes:
+        note_search = st.selectbox("Dominant Note", ["All Notes"] + filters.top_notes)
 
     st.markdown("---")
     st.markdown(f"""
@@ -399,89 +171,60 @@ with st.expander("👁️ How AI Matches Vibe? (Click to learn)"):
     """, unsafe_allow_html=True)
 
 query = st.text_input("Search", placeholder="Type your olfactory vision here...")
+similar_param = st.query_params.get("similar")
 
 if query and df is not None:
     st.write("")
+    if not engine.model_ready:
+        # The page is up while the model loads in the background (engine.py)
+        with st.spinner("Warming up the AI Brain..."):
+            try:
+                engine.wait_for_model()
+            except Exception as e:
+                st.error(f"Model unavailable: {e}")
+                load_data.clear()  # retry the load on the next run
+                st.stop()
+    # Per-stage timings (cache, encode, search, lexical, rerank, render) -> log + metrics
+    timer = StageTimer()
     with st.spinner("Decoding Vibe..."):
-        # 1. AI Search (Wide Net)
-        query_vec = model.encode(query, convert_to_tensor=True)
-        hits = util.semantic_search(query_vec, embeddings, top_k=80) 
+        # 1. AI Search (Wide Net) + 2. Re-rank, filters applied before top-k (engine.py);
+        # runs once per query/filter combination, "Load more" reuses the ranked list
+        page = ranked_results(
+            ("search", query, gender_option, min_rating, note_search),
+            lambda: engine.search(query, gender_option, min_rating, note_search, k=MAX_RESULTS, timer=timer),
+        )
         
         st.markdown(f"<div style='text-align:center; color:#666; font-size:0.7rem; letter-spacing:2px; margin-bottom:30px; text-transform:uppercase;'>Olfactory Matches: <i>'{query}'</i></div>", unsafe_allow_html=True)
         
-        # 2. Process
-        processed_results = []
-        query_words = set(re.split(r'\W+', query.lower()))
-        query_words = {w for w in query_words if len(w) > 2} 
-
-        for hit in hits[0]:
-            idx = hit['corpus_id']
-            row = df.iloc[idx]
-            
-            # FILTERS
-            if gender_option != "All" and str(row['Gender']) != str(gender_option): continue
-            if note_search != "All Notes" and note_search.lower() not in str(row['Main Accords']).lower(): continue
-            
-            # RATING CHECK
-            rating_val = float(row.get('Rating Value', 0))
-            if rating_val < min_rating: continue
-            
-            # --- HIERARCHY LOGIC V10.0 ---
-            
-            # 1. Complex Match
-            notes_text = str(row['Main Accords']).lower()
-            match_count = 0
-            for word in query_words:
-                if word in notes_text:
-                    match_count += 1
-            
-            # 2. Visual Match
-            name_text = (str(row['Name']) + " " + str(row['Brand'])).lower()
-            name_match = 0
-            for word in query_words:
-                if word in name_text:
-                    name_match = 1
-            
-            row['ai_score'] = hit['score']
-            row['match_count'] = match_count
-            row['name_match'] = name_match
-            processed_results.append(row)
-            
-        # 3. SORTING STRATEGY
-        processed_results.sort(key=lambda x: (x['match_count'], x['ai_score'], x['name_match'], float(x.get('Rating Value', 0))), reverse=True)
-        
-        display_results = processed_results[:15]
-        
-        if not display_results:
+        if not len(page["ids"]):
              st.warning(f"No matches found with Rating {min_rating}+. Try lowering the rating filter.")
         else:
-            col1, col2, col3 = st.columns([1,1,1])
-            cols = [col1, col2, col3]
-            
-            for i, row in enumerate(display_results):
-                current_col = cols[i % 3]
-                
-                brand = str(row['Brand']).replace('"', '').replace("'", "")
-                name = str(row['Name']).replace('"', '').replace("'", "")
-                notes = str(row['Main Accords']).replace("-", " ").replace('"', '')
-                if len(notes) > 50: notes = notes[:50] + "..."
-                
-                rating = float(row.get('Rating Value', 0))
-                link = row.get('url', '#')
-                
-                gender = str(row.get('Gender', 'Unisex')).capitalize()
-                year = str(row.get('Year', ''))
-                meta_info = f"{gender}"
-                if year: meta_info += f" &bull; {year}"
-                
-                initials = get_initials(brand)
-                raw_score = row['ai_score']
-                visual_score = int(min(98, max(50, raw_score * 180)))
-                
-                card_html = f"""<div class="perfume-card"><div class="brand-emblem">{initials}</div><div style="width:100%"><div class="row-brand">{brand}</div><div class="row-name">{name}</div><div class="row-meta">{meta_info}</div><div class="row-rating">★ {rating:.2f}</div><div class="match-wrapper"><div class="match-header"><span>Vibe Match</span><span>{visual_score}%</span></div><div class="bar-bg"><div class="bar-fill" style="width:{visual_score}%"></div></div><div class="match-explain">Analyzed via Scent Profile</div></div><div class="row-notes">{notes}</div></div><a href="{link}" target="_blank" class="gold-btn">FRAGRANTICA</a></div>"""
-                
-                with current_col:
-                    st.markdown(card_html, unsafe_allow_html=True)
+            with timer.stage('render'):
+                render_page(page)
+    timer.record('app')
+    logger.info(timer.log_line(source='app', query_len=len(query), results=len(page["ids"]),
+                               cursor=page["cursor"], cache=engine.cache.stats()))
+
+elif similar_param is not None and df is not None:
+    # MORE LIKE THIS: precomputed neighbour graph, no model encode. With sidebar filters
+    # fewer stored neighbours survive; one page of them is enough to skip the scan
+    similar_depth = min(MAX_RESULTS, engine.graph.k) if engine.graph is not None else MAX_RESULTS
+    try:
+        similar_id = int(similar_param)
+        page = ranked_results(
+            ("similar", similar_id, gender_option, min_rating, note_search),
+            lambda: engine.similar(similar_id, similar_depth, gender_option, min_rating, note_search,
+                                   min_hits=PAGE_SIZE),
+        )
+    except (ValueError, IndexError):
+        st.warning("This perfume is no longer in the catalog. Try a new search.")
+    else:
+        source = df.iloc[similar_id]
+        st.markdown(f"<div style='text-align:center; color:#666; font-size:0.7rem; letter-spacing:2px; margin-bottom:30px; text-transform:uppercase;'>More Like: <i>{source['Brand']} {source['Name']}</i> &bull; <a href='./' target='_self' style='color:#888;'>Clear</a></div>", unsafe_allow_html=True)
+        if not len(page["ids"]):
+            st.warning(f"No similar perfumes found with Rating {min_rating}+. Try lowering the rating filter.")
+        else:
+            render_page(page)
 
 # --- 6. FOOTER ---
 st.markdown("""
@@ -0,0 +1,77 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+# --- DYNAMIC MICRO-BATCHING ---
+# Concurrent sessions each encode a single query. The batcher collects queries
+# arriving within max_wait_ms (up to max_batch_size), encodes them in one model
+# call and resolves each caller's future with its own row. It is a drop-in for
+# the model in SearchEngine: encode() always returns normalized float32 numpy.
+# max_wait_ms=0 batches greedily: no added latency when idle, and queries that
+# queue up while the model is busy still share the next call.
+
+
+class EncodeBatcher:
+    def __init__(self, model, max_batch_size=32, max_wait_ms=2.0):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self.batches = 0
+        self.items = 0
+        self._worker = threading.Thread(target=self._run, name="encode-batcher", daemon=True)
+        self._worker.start()
+
+    def __getattr__(self, name):
+        # Everything else (e.g. get_sentence_embedding_dimension) goes to the model
+        return getattr(self.model, name)
+
+    def submit(self, text):
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def encode(self, sentences, **kwargs):
+        single = isinstance(sentences, str)
+        futures = [self.submit(s) for s in ([sentences] if single else sentences)]
+        vectors = np.stack([f.result() for f in futures])
+        return vectors[0] if single else vectors
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                # Past the deadline, still take whatever is already queued
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for text, _ in batch]
+            try:
+                vectors = self.model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+                vectors = np.asarray(vectors, dtype=np.float32)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
@@ -0,0 +1,89 @@
+import argparse
+import time
+
+import numpy as np
+
+from common import load_corpus, synthetic_queries, time_calls, report
+from ann_index import IVFIndex, HNSWIndex
+from engine import CANDIDATES
+from search_engine import SearchEngine, l2_normalize
+
+# --- ANN TRADE-OFF: recall@15 vs latency against the exact scan ---
+# Then masked searches at k = CANDIDATES with 5 / 50 / 5000 eligible rows and a
+# 10% filter: the results must hold every eligible row up to k (exact-scan
+# fallback included) and keep recall above --min-masked-recall.
+
+
+def recall_at_k(index_search, queries, truth, k):
+    hits = [len(set(index_search(q)[0][:k].tolist()) & truth[i]) / k for i, q in enumerate(queries)]
+    return float(np.mean(hits))
+
+
+def check_masked(label, index, corpus, queries, min_recall, sizes=None, seed=4):
+    # Restrictive sidebar filters: the index may come back short (or raise, in
+    # hnswlib); SearchEngine must then fall back to the exact scan, never fail,
+    # and keep recall@80 against the exact masked scan above min_recall
+    rng = np.random.default_rng(seed)
+    sizes = sizes or sorted({5, 50, 5000, len(corpus) // 10})
+    ann = SearchEngine(corpus, normalized=True, index=index, exact_below=0)
+    exact = SearchEngine(corpus, normalized=True)
+    for size in sizes:
+        mask = np.zeros(len(corpus), dtype=bool)
+        mask[rng.choice(len(corpus), size=min(size, len(corpus)), replace=False)] = True
+        search = lambda q: ann.search_vectors(q, CANDIDATES, mask=mask)[0]
+        for q in queries[:20]:
+            ids, _ = search(q)
+            assert len(ids) == min(CANDIDATES, size), f"{label}: {len(ids)} hits for a {size}-row mask"
+            assert mask[ids].all(), f"{label}: hit outside the mask"
+        recall = recall_at_k(search, queries, [set(exact.search_vectors(q, CANDIDATES, mask=mask)[0][0].tolist())
+                                               for q in queries], min(CANDIDATES, size))
+        report(f"{label} mask={size:<6} recall {recall:.3f}", time_calls(search, queries))
+        assert recall >= min_recall, f"{label}: recall {recall:.3f} < {min_recall} with a {size}-row mask"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ANN recall/latency benchmark")
+    parser.add_argument('--store', default=None, help="vector store directory (default: synthetic corpus)")
+    parser.add_argument('--rows', type=int, default=400000, help="synthetic corpus size")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=15)
+    parser.add_argument('--nlist', type=int, default=None)
+    parser.add_argument('--nprobe', default='1,2,4,8,16,32,64')
+    parser.add_argument('--ef', default='16,32,64,128,256')
+    parser.add_argument('--min-masked-recall', type=float, default=0.95,
+                        help=f"recall@{CANDIDATES} floor for filtered searches (exact masked scan as truth)")
+    args = parser.parse_args()
+
+    corpus = l2_normalize(load_corpus(args.store, rows=args.rows))
+    queries = l2_normalize(synthetic_queries(corpus, args.queries))
+    k = args.k
+
+    exact = SearchEngine(corpus, normalized=True)
+    truth = [set(exact.search_vectors(q, k)[0][0].tolist()) for q in queries]
+    report("exact scan", time_calls(lambda q: exact.search_vectors(q, k), queries))
+
+    start = time.perf_counter()
+    ivf = IVFIndex.build(corpus, nlist=args.nlist)
+    print(f"\nIVF build: nlist={len(ivf.centroids)} in {time.perf_counter() - start:.1f} s")
+    for nprobe in [int(n) for n in args.nprobe.split(',')]:
+        search = lambda q, n=nprobe: ivf.search(q, k, nprobe=n)
+        recall = recall_at_k(search, queries, truth, k)
+        report(f"ivf nprobe={nprobe:<4} recall {recall:.3f}", time_calls(search, queries))
+    check_masked("ivf", ivf, corpus, queries, args.min_masked_recall)
+
+    try:
+        start = time.perf_counter()
+        hnsw = HNSWIndex.build(corpus)
+    except ImportError:
+        print("\nhnswlib not installed; skipping HNSW.")
+        return
+    print(f"\nHNSW build in {time.perf_counter() - start:.1f} s")
+    for ef in [int(e) for e in args.ef.split(',')]:
+        search = lambda q, e=ef: hnsw.search(q, k, ef=e)
+        recall = recall_at_k(search, queries, truth, k)
+        report(f"hnsw ef={ef:<4} recall {recall:.3f}", time_calls(search, queries))
+    check_masked("hnsw", hnsw, corpus, queries, args.min_masked_recall)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from common import StandInEncoder
+from batcher import EncodeBatcher
+
+# --- MICRO-BATCHING: throughput and p99 latency vs concurrency ---
+# Each client thread encodes one query at a time, like a Streamlit session or
+# an API request. Runs offline with the stand-in encoder; --model uses the real one.
+
+QUERIES = ["Old library with cognac", "Walk in a rainy forest", "Warm Spicy Vanilla", "Fresh Citrus & Wood",
+           "vanilla", "fresh citrus", "oud", "dark woody leather", "powdery iris", "sea salt and sage"]
+
+
+def run(encoder, clients, requests_per_client):
+    latencies = []
+    lock = threading.Lock()
+
+    def client(seed):
+        local = []
+        for i in range(requests_per_client):
+            start = time.perf_counter()
+            encoder.encode([QUERIES[(seed + i) % len(QUERIES)]])
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode micro-batching benchmark")
+    parser.add_argument('--model', default=None, help="SentenceTransformer name (default: offline stand-in)")
+    parser.add_argument('--concurrency', default='1,2,4,8,16,32')
+    parser.add_argument('--requests', type=int, default=20, help="requests per client")
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    if args.model:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(args.model)
+    else:
+        model = StandInEncoder()
+    batcher = EncodeBatcher(model, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+
+    print(f"{'clients':>7} | {'unbatched QPS':>13} {'p50':>8} {'p99':>8} | {'batched QPS':>11} {'p50':>8} {'p99':>8}")
+    for clients in [int(c) for c in args.concurrency.split(',')]:
+        base = run(model, clients, args.requests)
+        batched = run(batcher, clients, args.requests)
+        print(f"{clients:>7} | {base[0]:>13.1f} {base[1]:>6.1f}ms {base[2]:>6.1f}ms | "
+              f"{batched[0]:>11.1f} {batched[1]:>6.1f}ms {batched[2]:>6.1f}ms")
+    print(f"Batcher: {batcher.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from common import REPO_ROOT, report, synthetic_catalog, synthetic_query_texts, time_calls
+from encoders import ENCODER_BACKENDS, load_encoder
+
+# --- ENCODER BACKENDS: parity, latency, startup ---
+# Needs the backends under test installed (torch / onnxruntime + tokenizers) and
+# the ONNX export on disk (python encoders.py --export --int8).
+#   parity   cosine between torch and each ONNX backend on fixed queries plus
+#            catalog texts; fails below --min-cosine (int8: --min-cosine-int8)
+#   latency  single-query p50/p95/p99 and batch-of-32 throughput
+#   startup  import + load + first encode, each backend in a fresh process
+#   python benchmarks/bench_encoders.py
+#   python benchmarks/bench_encoders.py --backends torch,onnx-int8 --csv scentsational_data.csv
+
+BATCH = 32
+
+
+def parity_texts(csv_path, rows, queries, seed=5):
+    # Search-style queries plus catalog "soup" strings, as generate_embeddings.py builds them
+    if csv_path and os.path.exists(csv_path):
+        from dataset import read_raw_csv
+        from generate_embeddings import prepare_frame
+
+        frame = prepare_frame(read_raw_csv(csv_path), verbose=False)
+        catalog = frame['text_features'].sample(min(rows, len(frame)), random_state=seed).tolist()
+    else:
+        frame = synthetic_catalog(rows, seed=seed)
+        catalog = (frame['Brand'].astype(str) + " " + frame['Name'] + " " + frame['Main Accords']).tolist()
+    return synthetic_query_texts(queries) + catalog
+
+
+def encode(model, texts, batch_size=BATCH):
+    return np.asarray(model.encode(texts, batch_size=batch_size, normalize_embeddings=True,
+                                   convert_to_numpy=True), dtype=np.float32)
+
+
+def parity(reference, candidate):
+    # Row-wise cosine of L2-normalized embeddings
+    cosines = (reference * candidate).sum(axis=1)
+    return {'min': float(cosines.min()), 'mean': float(cosines.mean()), 'p01': float(np.percentile(cosines, 1))}
+
+
+def latency(label, model, queries):
+    timings = time_calls(lambda q: encode(model, [q]), queries)
+    single = report(f"{label} single query", timings)
+    batches = [queries[i:i + BATCH] for i in range(0, len(queries) - BATCH + 1, BATCH)] or [queries]
+    start = time.perf_counter()
+    for batch in batches:
+        encode(model, batch)
+    elapsed = time.perf_counter() - start
+    throughput = sum(len(b) for b in batches) / elapsed
+    print(f"{label + ' batch ' + str(BATCH):<32} {throughput:8.1f} texts/s")
+    return {**single, 'batch_per_s': throughput}
+
+
+def startup(backend):
+    # Fresh interpreter: nothing imported or cached by the parent
+    code = ("import json, sys, time; t0 = time.perf_counter(); sys.path.insert(0, {root!r}); "
+            "from encoders import load_encoder; m = load_encoder(backend={backend!r}); t1 = time.perf_counter(); "
+            "m.encode(['warm spicy vanilla'], normalize_embeddings=True); t2 = time.perf_counter(); "
+            "print(json.dumps({{'load_s': t1 - t0, 'first_encode_s': t2 - t1}}))").format(root=REPO_ROOT,
+                                                                                        backend=backend)
+    out = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encoder backend parity and latency benchmark")
+    parser.add_argument('--backends', default=','.join(ENCODER_BACKENDS),
+                        help="comma-separated; torch (the parity reference) is required")
+    parser.add_argument('--csv', default=None, help="sample catalog texts from this CSV (default: synthetic)")
+    parser.add_argument('--rows', type=int, default=500, help="catalog texts in the parity set")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--min-cosine', type=float, default=0.999, help="parity floor for onnx vs torch")
+    parser.add_argument('--min-cosine-int8', type=float, default=0.98, help="parity floor for onnx-int8 vs torch")
+    args = parser.parse_args()
+
+    backends = args.backends.split(',')
+    if 'torch' not in backends:
+        parser.error("--backends must include torch: it is the parity reference")
+    backends = ['torch'] + [b for b in backends if b != 'torch']
+    texts = parity_texts(args.csv, args.rows, args.queries)
+    queries = texts[:args.queries]
+    print(f"Parity set: {len(texts)} texts ({args.queries} queries + {len(texts) - args.queries} catalog)")
+
+    results, reference, failures = {}, None, []
+    for backend in backends:
+        model = load_encoder(backend=backend)
+        embeddings = encode(model, texts)
+        results[backend] = latency(backend, model, queries)
+        results[backend].update(startup(backend))
+        if backend == 'torch':
+            reference = embeddings
+        else:
+            stats = parity(reference, embeddings)
+            floor = args.min_cosine_int8 if backend == 'onnx-int8' else args.min_cosine
+            results[backend]['cosine'] = stats
+            if stats['min'] < floor:
+                failures.append(f"{backend}: min cosine {stats['min']:.5f} < {floor}")
+        del model
+
+    print(f"\n{'backend':<10} {'load s':>7} {'1st enc s':>9} {'p50 ms':>8} {'p95 ms':>8} {'batch/s':>8} "
+          f"{'cos min':>8} {'cos mean':>9}")
+    for backend, r in results.items():
+        cosine = r.get('cosine', {})
+        print(f"{backend:<10} {r['load_s']:>7.2f} {r['first_encode_s']:>9.3f} {r['p50']:>8.2f} {r['p95']:>8.2f} "
+              f"{r['batch_per_s']:>8.1f} {cosine.get('min', 1.0):>8.5f} {cosine.get('mean', 1.0):>9.5f}")
+    assert not failures, "parity check failed: " + "; ".join(failures)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import synthetic_catalog, time_calls, report
+from filter_index import FilterIndex
+
+# --- SIDEBAR RERUN COST: rebuilding facets per rerun vs the precomputed FilterIndex ---
+
+
+def legacy_sidebar(df):
+    # What app.py ran on every Streamlit rerun
+    genders = ["All"] + sorted([g for g in df['Gender'].astype(str).unique() if g != 'nan'])
+    all_notes = ','.join(df['Main Accords'].astype(str)).replace('nan', '').split(',')
+    all_notes = [n.strip().title() for n in all_notes if len(n) > 2]
+    top_notes = pd.Series(all_notes).value_counts().head(50).index.tolist()
+    top_notes.sort()
+    return genders, top_notes
+
+
+def legacy_filter(df, gender, note):
+    # Row-by-row checks the old query loop applied to each hit, over the whole catalog
+    return np.array([str(g) == gender and note.lower() in str(a).lower()
+                     for g, a in zip(df['Gender'], df['Main Accords'])])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sidebar facet benchmark")
+    parser.add_argument('--rows', type=int, default=40000)
+    parser.add_argument('--reruns', type=int, default=30)
+    args = parser.parse_args()
+
+    df = synthetic_catalog(args.rows, seed=2)
+    start = time.perf_counter()
+    filters = FilterIndex(df)
+    print(f"FilterIndex build (once per process): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    assert legacy_sidebar(df) == (filters.genders, filters.top_notes), "facet values differ"
+    reruns = list(range(args.reruns))
+    report("rerun: rebuild facets", time_calls(lambda _: legacy_sidebar(df), reruns))
+    report("rerun: read FilterIndex", time_calls(lambda _: (filters.genders, filters.top_notes), reruns))
+
+    note = filters.top_notes[0]
+    assert (legacy_filter(df, 'women', note) == filters.mask('women', 0.0, note)).all()
+    report("filter: per-row checks", time_calls(lambda _: legacy_filter(df, 'women', note), reruns[:10]))
+    report("filter: bitmap mask", time_calls(lambda _: filters.mask('women', 0.0, note), reruns))
+
+
+if __name__ == "__main__":
+    main()
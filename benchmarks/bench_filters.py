@@ -0,0 +1,61 @@
+import argparse
+
+import numpy as np
+
+from common import RARE_ACCORDS, synthetic_catalog, synthetic_corpus, synthetic_queries, time_calls, report
+from filter_index import FilterIndex
+from search_engine import SearchEngine
+
+# --- FILTER RECALL: post-filtering a fixed top-80 vs masking before top-k ---
+# Adversarial combination: niche gender + rating 4.0+ + rare accord.
+
+
+def post_filter(engine, df, q, gender, min_rating, note, wide=80, k=15):
+    # Previous app.py behaviour: fixed top-80, then drop failing rows
+    ids, _ = engine.search_vectors(q, wide)[0]
+    kept = [i for i in ids
+            if str(df['Gender'].iat[i]) == gender
+            and note.lower() in str(df['Main Accords'].iat[i]).lower()
+            and df['Rating Value'].iat[i] >= min_rating]
+    return np.array(kept[:k], dtype=np.int64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Filtered search recall benchmark")
+    parser.add_argument('--rows', type=int, default=40000)
+    parser.add_argument('--queries', type=int, default=100)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.rows)
+    df = synthetic_catalog(args.rows, seed=2)
+    queries = synthetic_queries(corpus, args.queries)
+    engine = SearchEngine(corpus)
+    filters = FilterIndex(df)
+    gender, min_rating, note, k = 'unisex', 4.0, RARE_ACCORDS[0].title(), 15
+
+    mask = filters.mask(gender, min_rating, note)
+    print(f"Filter '{gender}' + {min_rating}+ + '{note}': {mask.sum()} of {len(df)} rows eligible")
+
+    post_counts, post_recall, pre_counts = [], [], []
+    for q in queries:
+        truth_scores = np.where(mask, engine.vectors @ (q / np.linalg.norm(q)), -np.inf)
+        truth = set(np.argsort(-truth_scores)[:min(k, mask.sum())].tolist())
+
+        post = post_filter(engine, df, q, gender, min_rating, note, k=k)
+        pre, _ = engine.search_vectors(q, k, mask=mask)[0]
+        assert set(pre.tolist()) == truth, "masked search must return the exact filtered top-k"
+
+        post_counts.append(len(post))
+        post_recall.append(len(truth & set(post.tolist())) / len(truth))
+        pre_counts.append(len(pre))
+
+    print(f"Post-filter top-80: avg {np.mean(post_counts):5.2f} results, recall@{k} {np.mean(post_recall):.2%}, "
+          f"{np.mean(np.array(post_counts) == 0):.0%} of queries empty")
+    print(f"Masked top-k:       avg {np.mean(pre_counts):5.2f} results, recall@{k} 100.00% (checked)")
+
+    report("mask build", time_calls(lambda _: filters.mask(gender, min_rating, note), list(range(50))))
+    report("masked search", time_calls(lambda q: engine.search_vectors(q, 80, mask=mask), queries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import time
+
+from common import QUERIES, synthetic_catalog, synthetic_corpus, synthetic_queries, time_calls, report
+from engine import CANDIDATES
+from lexical import LexicalIndex, reciprocal_rank_fusion
+from search_engine import SearchEngine
+
+# --- HYBRID CANDIDATE GENERATION: BM25 postings + semantic scan + RRF ---
+# --csv runs on the real catalog (dataset.load_dataset), otherwise a synthetic
+# one with the same columns.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lexical / hybrid candidate generation benchmark")
+    parser.add_argument('--csv', default=None, help="catalog CSV (default: synthetic catalog)")
+    parser.add_argument('--rows', type=int, default=40000)
+    args = parser.parse_args()
+
+    if args.csv:
+        from dataset import load_dataset
+        df = load_dataset(args.csv)
+        print(f"Catalog: {args.csv} ({len(df)} rows)")
+    else:
+        df = synthetic_catalog(args.rows)
+        print(f"Catalog: synthetic ({len(df)} rows)")
+
+    start = time.perf_counter()
+    index = LexicalIndex(df)
+    print(f"Index build: {time.perf_counter() - start:.2f} s | {len(index)} tokens | "
+          f"{(index.rows.nbytes + index.impacts.nbytes) / 2**20:.1f} MB postings")
+
+    # Fixed query set, repeated so percentiles are stable
+    queries = QUERIES * 25
+    report("bm25 top-80", time_calls(lambda q: index.search(q, CANDIDATES), queries))
+
+    corpus = synthetic_corpus(len(df))
+    engine = SearchEngine(corpus)
+    query_vecs = synthetic_queries(corpus, len(queries))
+    pairs = list(zip(queries, query_vecs))
+
+    def hybrid(pair):
+        query, vec = pair
+        semantic_ids, _ = engine.search_vectors(vec, CANDIDATES)[0]
+        lexical_ids, _ = index.search(query, CANDIDATES)
+        return reciprocal_rank_fusion([semantic_ids, lexical_ids])
+
+    report("semantic top-80", time_calls(lambda pair: engine.search_vectors(pair[1], CANDIDATES), pairs))
+    report("hybrid (semantic + bm25 + rrf)", time_calls(hybrid, pairs))
+
+    # Rows an exact brand/accord query matches; semantic-only retrieval saw just its top-80
+    for query in ["guerlain", "oud rose", "leather"]:
+        print(f"  '{query}': {len(index.scores(query)[0])} rows match lexically")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import time
+
+import numpy as np
+
+from common import load_corpus, time_calls, report
+from neighbours import NeighbourGraph, build_knn_graph
+from search_engine import SearchEngine, l2_normalize
+
+# --- "MORE LIKE THIS": precomputed graph lookup vs exact scan ---
+# The graph build is a one-off offline cost (generate_embeddings.py --knn);
+# the lookup is what a card click pays at request time.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Neighbour graph benchmark")
+    parser.add_argument('--store', default=None, help="vector store directory (default: synthetic corpus)")
+    parser.add_argument('--rows', type=int, default=40000)
+    parser.add_argument('--lookups', type=int, default=500)
+    parser.add_argument('--knn', type=int, default=50, help="neighbours stored per perfume")
+    parser.add_argument('--k', type=int, default=15)
+    args = parser.parse_args()
+
+    corpus = l2_normalize(load_corpus(args.store, rows=args.rows))
+    k = args.k
+
+    start = time.perf_counter()
+    knn_ids, knn_scores = build_knn_graph(corpus, k=args.knn)
+    build_s = time.perf_counter() - start
+    graph = NeighbourGraph(knn_ids, knn_scores)
+    size_mb = (knn_ids.nbytes + knn_scores.nbytes) / 2**20
+    print(f"Graph build: {build_s:.1f} s | {size_mb:.1f} MB on disk ({args.knn} neighbours per row)")
+
+    exact = SearchEngine(corpus, normalized=True)
+    rows = np.random.default_rng(2).integers(0, len(corpus), size=args.lookups)
+
+    def scan(row_id):
+        mask = np.ones(len(corpus), dtype=bool)
+        mask[row_id] = False
+        return exact.search_vectors(corpus[row_id], k, mask=mask)[0]
+
+    # Graph scores are float16, so only compare the id sets
+    overlap = np.mean([len(set(graph.neighbours(r, k)[0].tolist()) & set(scan(r)[0].tolist())) / k
+                       for r in rows[:100]])
+    print(f"Overlap with exact top-{k}: {overlap:.4f}")
+
+    report("exact scan", time_calls(scan, rows))
+    report("graph lookup", time_calls(lambda r: graph.neighbours(r, k), rows))
+
+
+if __name__ == "__main__":
+    main()
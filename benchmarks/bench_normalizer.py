@@ -0,0 +1,123 @@
+import argparse
+import string
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import ACCORDS, BRANDS, HINT_QUERIES, report, synthetic_catalog, time_calls
+from lexical import LexicalIndex
+from spelling import QueryNormalizer, max_distance
+
+# --- QUERY NORMALIZATION: index build, lookup latency, correction accuracy ---
+# Vocabulary from the catalog's accords, names and brands (--csv for the real
+# one; the synthetic catalog gets --name-words random pseudo-words in its names
+# so the vocabulary is full-size). Queries mix clean hint queries with
+# accord/brand words given 1 random edit (2 from 7 characters up): delete,
+# insert, substitute or swap. Fails if the p99 per query exceeds --budget-ms, if
+# any intro hint query (all valid words) is rewritten, or if a valid word the
+# vocabulary lacks (KEEP_WORDS: "rainy" next to "rain", "sweat" next to "sweet")
+# is rewritten; that check drops the query forms from the vocabulary first.
+#   python benchmarks/bench_normalizer.py
+#   python benchmarks/bench_normalizer.py --csv scentsational_data.csv
+
+LETTERS = np.array(list(string.ascii_lowercase))
+# valid query word -> the vocabulary word it must not be rewritten to
+KEEP_WORDS = {
+    'rainy': 'rain', 'dreamy': 'dream', 'beachy': 'beach', 'smoky': 'smoke', 'lights': 'light',
+    'sweat': 'sweet', 'woods': 'wood',
+}
+
+
+def synthetic_names(df, words, seed=9):
+    rng = np.random.default_rng(seed)
+    vocabulary = [''.join(rng.choice(LETTERS, size=rng.integers(4, 11))) for _ in range(words)]
+    picks = rng.integers(0, len(vocabulary), size=(len(df), 2))
+    df = df.copy()
+    df['Name'] = [f"{vocabulary[a]} {vocabulary[b]}" for a, b in picks]
+    return df
+
+
+def misspell(word, rng):
+    for _ in range(max_distance(len(word))):
+        i = int(rng.integers(0, len(word)))
+        edit = rng.integers(0, 4)
+        if edit == 0 and len(word) > 1:
+            word = word[:i] + word[i + 1:]
+        elif edit == 1:
+            word = word[:i] + rng.choice(LETTERS) + word[i:]
+        elif edit == 2:
+            word = word[:i] + rng.choice(LETTERS) + word[i + 1:]
+        elif i + 1 < len(word):
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word
+
+
+def typo_cases(count, seed=13):
+    # (misspelled word, expected correction) over the words of the accords and brands
+    rng = np.random.default_rng(seed)
+    words = sorted({w for term in ACCORDS + BRANDS for w in term.lower().split() if len(w) >= 4})
+    cases = []
+    while len(cases) < count:
+        word = str(rng.choice(words))
+        typo = misspell(word, rng)
+        if typo != word:
+            cases.append((typo, word))
+    return cases
+
+
+def kept_words(normalizer):
+    # Valid words rewritten by a normalizer whose vocabulary has their neighbours but not them
+    words = [w for w in normalizer.words if w not in KEEP_WORDS] + list(KEEP_WORDS.values())
+    frequencies = dict(zip(normalizer.words, normalizer.frequencies.tolist()))
+    check = QueryNormalizer(words, [frequencies.get(w, 1) for w in words])
+    queries = list(KEEP_WORDS) + HINT_QUERIES
+    return {q: check.normalize(q) for q in queries if check.normalize(q) != q}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query normalization benchmark")
+    parser.add_argument('--csv', default=None, help="catalog CSV (default: synthetic catalog)")
+    parser.add_argument('--rows', type=int, default=40000)
+    parser.add_argument('--name-words', type=int, default=30000, help="distinct pseudo-words in synthetic names")
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--budget-ms', type=float, default=1.0, help="p99 latency budget per query")
+    args = parser.parse_args()
+
+    if args.csv:
+        from dataset import load_dataset
+        df = load_dataset(args.csv)
+        print(f"Catalog: {args.csv} ({len(df)} rows)")
+    else:
+        df = synthetic_names(synthetic_catalog(args.rows), args.name_words)
+        print(f"Catalog: synthetic ({len(df)} rows, {args.name_words} name words)")
+
+    lexical = LexicalIndex(df)
+    start = time.perf_counter()
+    normalizer = QueryNormalizer.from_index(lexical)
+    print(f"Index build: {time.perf_counter() - start:.2f} s | {len(normalizer)} words | "
+          f"{len(normalizer.keys)} delete keys | {(normalizer.keys.nbytes + normalizer.owners.nbytes) / 2**20:.1f} MB")
+
+    cases = typo_cases(args.queries)
+    queries = pd.Series([typo for typo, _ in cases] + HINT_QUERIES * 25).sample(frac=1.0, random_state=0).tolist()
+    results = {
+        'clean word': report("clean word", time_calls(normalizer.normalize, [w for _, w in cases])),
+        'misspelled word': report("misspelled word", time_calls(normalizer.normalize, [t for t, _ in cases])),
+        'mixed queries': report("mixed queries", time_calls(normalizer.normalize, queries)),
+    }
+
+    fixed = sum(normalizer.normalize(typo) == word for typo, word in cases)
+    untouched = sum(normalizer.normalize(q) == q for q in HINT_QUERIES)
+    print(f"Corrected: {fixed}/{len(cases)} misspellings ({fixed / len(cases):.1%}) | "
+          f"hint queries unchanged: {untouched}/{len(HINT_QUERIES)}")
+
+    slow = {label: r['p99'] for label, r in results.items() if r['p99'] > args.budget_ms}
+    assert not slow, f"p99 over the {args.budget_ms} ms budget: {slow}"
+    rewritten = {q: normalizer.normalize(q) for q in HINT_QUERIES if normalizer.normalize(q) != q}
+    assert not rewritten, f"hint queries rewritten: {rewritten}"
+    rewritten = kept_words(normalizer)
+    assert not rewritten, f"valid words rewritten without their own vocabulary entry: {rewritten}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+
+import numpy as np
+
+from common import load_corpus, synthetic_queries, time_calls, report
+from quantization import QuantizedVectors
+from search_engine import SearchEngine, l2_normalize
+
+# --- QUANTIZED STORAGE: memory, latency and recall@15 per mode ---
+# "scan" is the resident array the first pass reads; rescoring touches only
+# rescore * k float32 rows of the memory-mapped store per query.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized storage benchmark")
+    parser.add_argument('--store', default=None, help="vector store directory (default: synthetic corpus)")
+    parser.add_argument('--rows', type=int, default=40000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=15)
+    parser.add_argument('--rescore', default='1,2,4,8')
+    args = parser.parse_args()
+
+    corpus = l2_normalize(load_corpus(args.store, rows=args.rows))
+    queries = l2_normalize(synthetic_queries(corpus, args.queries))
+    k = args.k
+
+    exact = SearchEngine(corpus, normalized=True)
+    truth = [set(exact.search_vectors(q, k)[0][0].tolist()) for q in queries]
+    print(f"{'mode':<24} {'scan MB':>8}")
+
+    def evaluate(label, engine, scan_bytes):
+        recall = np.mean([len(set(engine.search_vectors(q, k)[0][0].tolist()) & truth[i]) / k
+                          for i, q in enumerate(queries)])
+        print(f"{label:<24} {scan_bytes / 2**20:>8.1f}   recall@{k} {recall:.3f}")
+        report(f"  {label}", time_calls(lambda q: engine.search_vectors(q, k), queries))
+
+    evaluate("float32 exact", exact, corpus.nbytes)
+    for mode in ('float16', 'int8'):
+        for rescore in [int(r) for r in args.rescore.split(',')]:
+            codes = QuantizedVectors.build(corpus, mode, rescore=rescore)
+            engine = SearchEngine(corpus, normalized=True, codes=codes)
+            evaluate(f"{mode} rescore x{rescore}", engine, codes.nbytes)
+
+
+if __name__ == "__main__":
+    main()
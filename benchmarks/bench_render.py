@@ -0,0 +1,68 @@
+import argparse
+import os
+
+import numpy as np
+
+from common import REPO_ROOT, synthetic_catalog
+from cards import card_html, grid_html, stylesheet_inline, stylesheet_link
+
+# --- RESULT RENDERING: websocket deltas and bytes per rerun, cards vs grid ---
+# Every Streamlit rerun re-sends each element as a delta message. Offline, the
+# payloads are sized from the same HTML builders app.py uses; --live runs app.py
+# under streamlit.testing (needs streamlit, the store and the model) and sizes
+# the actual element protos after a search and each "Load More".
+#   cards  inline <style> + columns block + 3 columns + one markdown per card
+#   grid   <link> to the cached stylesheet + one markdown for all cards
+
+
+def offline(pages, page_size):
+    df = synthetic_catalog(page_size * pages)
+    rng = np.random.default_rng(0)
+    scores = rng.uniform(0.3, 0.6, size=len(df))
+    css_inline, css_link = len(stylesheet_inline().encode()), len(stylesheet_link().encode())
+    print(f"Stylesheet: {css_inline} bytes inline per rerun vs {css_link} byte <link> "
+          f"(file fetched once per browser session)")
+    print(f"{'cards shown':>11} | {'cards msgs':>10} {'cards bytes':>11} | {'grid msgs':>9} {'grid bytes':>10}")
+    for page in range(1, pages + 1):
+        shown = page * page_size
+        ids = np.arange(shown)
+        card_bytes = sum(len(card_html(df.iloc[i], i, scores[i]).encode()) for i in ids)
+        grid_bytes = len(grid_html(df, ids, scores[:shown]).encode())
+        cards_msgs = 1 + 1 + 3 + shown  # stylesheet, columns block, 3 columns, cards
+        grid_msgs = 1 + 1  # stylesheet link, grid
+        print(f"{shown:>11} | {cards_msgs:>10} {css_inline + card_bytes:>11} | {grid_msgs:>9} {css_link + grid_bytes:>10}")
+
+
+def live(mode, query, pages):
+    from streamlit.testing.v1 import AppTest
+
+    os.environ['SCENT_RENDER_MODE'] = mode
+    os.chdir(REPO_ROOT)
+    at = AppTest.from_file(os.path.join(REPO_ROOT, 'app.py'), default_timeout=600)
+    at.run()
+    at.text_input[0].input(query).run()
+    for page in range(pages):
+        if page:
+            at.button(key="load_more").click().run()
+        messages = len(at.markdown) + len(at.columns) + len(at.button)
+        size = sum(m.proto.ByteSize() for m in at.markdown)
+        print(f"{mode:>5} page {page + 1}: {messages} elements, {size} bytes of markdown protos")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Result rendering payload benchmark")
+    parser.add_argument('--pages', type=int, default=3, help="result pages (initial + 'Load More' clicks)")
+    parser.add_argument('--page-size', type=int, default=15)
+    parser.add_argument('--live', action='store_true', help="run app.py under streamlit.testing")
+    parser.add_argument('--query', default="Warm Spicy Vanilla")
+    args = parser.parse_args()
+
+    if args.live:
+        for mode in ('cards', 'grid'):
+            live(mode, args.query, args.pages)
+    else:
+        offline(args.pages, args.page_size)
+
+
+if __name__ == "__main__":
+    main()
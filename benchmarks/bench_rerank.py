@@ -0,0 +1,66 @@
+import argparse
+import re
+
+import numpy as np
+
+from common import QUERIES, synthetic_catalog, time_calls, report
+from ranking import Reranker
+
+# --- RE-RANK: legacy per-hit df.iloc loop vs columnar np.lexsort ---
+# Also a regression check: both must produce the same ordering, ties included.
+
+
+def legacy_rank(df, ids, scores, query):
+    processed_results = []
+    query_words = set(re.split(r'\W+', query.lower()))
+    query_words = {w for w in query_words if len(w) > 2}
+    for idx, score in zip(ids, scores):
+        row = df.iloc[idx]
+        notes_text = str(row['Main Accords']).lower()
+        match_count = 0
+        for word in query_words:
+            if word in notes_text:
+                match_count += 1
+        name_text = (str(row['Name']) + " " + str(row['Brand'])).lower()
+        name_match = 0
+        for word in query_words:
+            if word in name_text:
+                name_match = 1
+        row['ai_score'] = float(score)
+        row['match_count'] = match_count
+        row['name_match'] = name_match
+        processed_results.append(row)
+    processed_results.sort(key=lambda x: (x['match_count'], x['ai_score'], x['name_match'], float(x.get('Rating Value', 0))), reverse=True)
+    return [int(r.name) for r in processed_results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-rank parity and latency benchmark")
+    parser.add_argument('--rows', type=int, default=40000)
+    parser.add_argument('--hits', type=int, default=80)
+    parser.add_argument('--trials', type=int, default=200)
+    args = parser.parse_args()
+
+    df = synthetic_catalog(args.rows, coarse_ratings=True)
+    reranker = Reranker(df)
+    rng = np.random.default_rng(4)
+
+    cases = []
+    for t in range(args.trials):
+        ids = rng.choice(args.rows, size=args.hits, replace=False)
+        scores = np.sort(rng.choice([0.31, 0.3, 0.42, 0.5], size=args.hits).astype(np.float32))[::-1]
+        cases.append((ids, scores, QUERIES[t % len(QUERIES)]))
+
+    for ids, scores, query in cases:
+        expected = legacy_rank(df, ids, scores, query)
+        got = reranker.rank(ids, scores, query)[0].tolist()
+        assert got == expected, f"ordering differs for {query!r}"
+    print(f"Parity: {len(cases)} candidate sets ranked identically to the legacy loop.")
+
+    old = report("legacy df.iloc loop", time_calls(lambda c: legacy_rank(df, *c), cases[:50]))
+    new = report("columnar lexsort", time_calls(lambda c: reranker.rank(*c), cases))
+    print(f"Speedup: p50 x{old['p50'] / new['p50']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+
+from common import load_corpus, synthetic_queries, time_calls, report
+from search_engine import SearchEngine
+
+# --- QUERY LATENCY: util.semantic_search vs normalized dot-product + argpartition ---
+# Encoding is identical in both paths and excluded; this measures the search step only.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantic search latency benchmark")
+    parser.add_argument('--store', default=None, help="vector store directory (default: synthetic 40k corpus)")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=80)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.store)
+    queries = synthetic_queries(corpus, args.queries)
+
+    engine = SearchEngine(corpus)
+    fast = report("numpy dot + argpartition", time_calls(lambda q: engine.search_vectors(q, args.k), queries))
+
+    try:
+        import torch
+        from sentence_transformers import util
+    except ImportError:
+        print("sentence-transformers not installed; skipping the util.semantic_search baseline.")
+        return
+
+    # Current app.py path: raw numpy corpus handed to semantic_search on every query
+    def legacy(q):
+        return util.semantic_search(torch.from_numpy(q), corpus, top_k=args.k)
+
+    slow = report("util.semantic_search", time_calls(legacy, queries))
+    print(f"Speedup: p50 x{slow['p50'] / fast['p50']:.1f} | p99 x{slow['p99'] / fast['p99']:.1f}")
+
+    # Same top-k ids (up to ties)
+    q = queries[0]
+    legacy_ids = [h['corpus_id'] for h in legacy(q)[0]]
+    fast_ids = engine.search_vectors(q, args.k)[0][0].tolist()
+    overlap = len(set(legacy_ids) & set(fast_ids)) / args.k
+    print(f"Top-{args.k} overlap with baseline: {overlap:.2%}")
+
+
+if __name__ == "__main__":
+    main()
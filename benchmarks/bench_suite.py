@@ -0,0 +1,154 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from common import EMBED_DIM, GENDERS, StandInEncoder, synthetic_catalog, synthetic_query_texts
+from engine import ScentEngine
+from filter_index import FilterIndex
+from lexical import LexicalIndex
+from metrics import StageTimer
+from query_cache import QueryCache
+from ranking import Reranker
+from search_engine import SearchEngine
+from spelling import QueryNormalizer
+
+# --- END-TO-END REGRESSION SUITE ---
+# The full ScentEngine query pipeline (query normalization, filters, encode,
+# scan, BM25 + fusion, re-rank) over a synthetic catalog, with the offline
+# stand-in encoder and the query caches disabled, so every query does the full work. Each corpus size
+# runs in its own process so peak RSS is per size:
+#   python benchmarks/bench_suite.py                       # 40k, 400k, 4M rows
+#   python benchmarks/bench_suite.py --rows 40000 --json   # one size, machine-readable
+# 4M rows needs ~6 GB for the vectors (memory-mapped from a temp file) plus the catalog.
+
+STAGES = ['normalize', 'cache', 'filters', 'encode', 'search', 'lexical', 'rerank']
+DEFAULT_SIZES = '40000,400000,4000000'
+
+
+def synthetic_vectors(path, rows, dim=EMBED_DIM, seed=0, clusters=256, block=100000):
+    # Same clustered distribution as common.synthetic_corpus, normalized and
+    # written block by block into a memmap so 4M rows never sit in RAM twice
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(rows, dim))
+    for start in range(0, rows, block):
+        n = min(block, rows - start)
+        chunk = centers[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim), dtype=np.float32)
+        vectors[start:start + n] = chunk / np.linalg.norm(chunk, axis=1, keepdims=True)
+    vectors.flush()
+    return np.load(path, mmap_mode='r')
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_size(args):
+    build = {}
+    start = time.perf_counter()
+    df = synthetic_catalog(args.rows)
+    build['catalog'] = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory(prefix='scent-bench-') as tmp:
+        start = time.perf_counter()
+        vectors = synthetic_vectors(os.path.join(tmp, 'vectors.npy'), args.rows)
+        build['vectors'] = time.perf_counter() - start
+
+        model = StandInEncoder(call_ms=args.encode_ms, item_ms=args.item_ms)
+        # Caches off: every query pays for encode, scan and re-rank
+        search = SearchEngine(vectors, model, normalized=True, cache=QueryCache('bench', capacity=0, results_capacity=0))
+        start = time.perf_counter()
+        filters, reranker = FilterIndex(df), Reranker(df)
+        build['indexes'] = time.perf_counter() - start
+        lexical, normalizer = None, None
+        if not args.no_lexical:
+            start = time.perf_counter()
+            lexical = LexicalIndex(df)
+            build['lexical'] = time.perf_counter() - start
+            start = time.perf_counter()
+            normalizer = QueryNormalizer.from_index(lexical)
+            build['normalizer'] = time.perf_counter() - start
+        engine = ScentEngine(df, search, filters, reranker, lexical=lexical, normalizer=normalizer)
+
+        queries = synthetic_query_texts(args.queries)
+        for query in queries[:5]:
+            engine.search(query)
+
+        # Latency: one query at a time, stage by stage
+        timers = []
+        for i, query in enumerate(queries):
+            timer = StageTimer()
+            gender = GENDERS[i % 3] if i % 4 == 3 else "All"  # every 4th query filtered
+            engine.search(query, gender=gender, timer=timer)
+            timers.append(timer.record('bench'))
+
+        # Throughput: the same query set from a pool of concurrent clients
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            list(pool.map(engine.search, queries))
+        qps = len(queries) / (time.perf_counter() - start)
+
+    totals = np.array([t['total'] for t in timers]) * 1000
+    p50, p95, p99 = np.percentile(totals, [50, 95, 99])
+    return {
+        'rows': args.rows,
+        'queries': len(queries),
+        'qps': qps,
+        'threads': args.threads,
+        'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+        'stage_p50_ms': {s: float(np.median([t.get(s, 0.0) for t in timers]) * 1000) for s in STAGES},
+        'build_s': build,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def print_result(result):
+    print(f"\n== {result['rows']:,} rows | {result['queries']} queries ==")
+    print("build: " + " | ".join(f"{k} {v:.2f}s" for k, v in result['build_s'].items()))
+    print(f"latency  p50 {result['p50_ms']:8.3f} ms | p95 {result['p95_ms']:8.3f} ms | p99 {result['p99_ms']:8.3f} ms")
+    print("stages   " + " | ".join(f"{k} {v:.3f}" for k, v in result['stage_p50_ms'].items()) + "  (p50 ms)")
+    print(f"throughput {result['qps']:.1f} QPS ({result['threads']} threads) | peak RSS {result['peak_rss_mb']:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end search regression suite")
+    parser.add_argument('--rows', default=DEFAULT_SIZES, help="comma-separated corpus sizes")
+    parser.add_argument('--queries', type=int, default=200, help="hint queries + synthetic ones")
+    parser.add_argument('--threads', type=int, default=8, help="concurrent clients for the throughput run")
+    parser.add_argument('--encode-ms', type=float, default=8.0, help="stand-in encoder cost per call")
+    parser.add_argument('--item-ms', type=float, default=0.4, help="stand-in encoder cost per query")
+    parser.add_argument('--no-lexical', action='store_true', help="semantic retrieval only")
+    parser.add_argument('--json', action='store_true', help="print one JSON result per size")
+    args = parser.parse_args()
+
+    sizes = [int(r) for r in args.rows.split(',')]
+    if len(sizes) == 1:
+        args.rows = sizes[0]
+        result = run_size(args)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print_result(result)
+        return
+
+    # One process per size: peak RSS of a size is not inflated by the previous one
+    for rows in sizes:
+        cmd = [sys.executable, os.path.abspath(__file__), '--rows', str(rows), '--json',
+               '--queries', str(args.queries), '--threads', str(args.threads),
+               '--encode-ms', str(args.encode_ms), '--item-ms', str(args.item_ms)]
+        if args.no_lexical:
+            cmd.append('--no-lexical')
+        out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        print_result(json.loads(out.strip().splitlines()[-1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Make the repo modules importable when running `python benchmarks/<script>.py`
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+CORPUS_ROWS = 40000
+EMBED_DIM = 384
+
+# Synthetic catalog vocabulary, shared by every benchmark
+HINT_QUERIES = ["Old library with cognac", "Walk in a rainy forest", "Warm Spicy Vanilla", "Fresh Citrus & Wood"]
+QUERIES = HINT_QUERIES + ["vanilla", "oud rose", "guerlain", "amber musk powder"]
+RARE_ACCORDS = ['tuberose', 'iris']  # each in ~3% of rows: the adversarial filter case
+ACCORDS = ['woody', 'citrus', 'sweet', 'vanilla', 'warm spicy', 'fresh spicy', 'amber', 'musky', 'powdery',
+           'aromatic', 'fruity', 'green', 'leather', 'oud', 'rose', 'white floral'] + RARE_ACCORDS
+BRANDS = ['Guerlain', 'Chanel', 'Dior', 'Le Labo', 'Amouage', 'Zara', 'Lattafa', 'Byredo', 'Creed', 'Hermes']
+MOODS = ['rainy', 'forest', 'library', 'cognac', 'beach', 'night', 'velvet', 'smoky', 'clean', 'cozy', 'garden']
+GENDERS = ['women', 'men', 'unisex']
+GENDER_SHARES = [0.47, 0.45, 0.08]  # unisex is the niche filter value
+
+
+def synthetic_corpus(rows=CORPUS_ROWS, dim=EMBED_DIM, seed=0, clusters=256):
+    # Clustered gaussian vectors: closer to real sentence embeddings than pure noise
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=rows)
+    vectors = centers[labels] + 0.6 * rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors.astype(np.float32)
+
+
+def synthetic_queries(corpus, count=200, seed=1):
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(corpus), size=count)
+    noise = 0.3 * rng.standard_normal((count, corpus.shape[1])).astype(np.float32)
+    return corpus[picks] + noise
+
+
+def synthetic_catalog(rows=CORPUS_ROWS, seed=3, coarse_ratings=False):
+    # Seeded catalog frame with the columns the engine reads; vectorized so 4M rows
+    # take seconds. 4 distinct common accords per row, then each rare accord
+    # replaces one of them in ~3% of rows. coarse_ratings: 4 rating values only,
+    # to exercise the re-rank tie-breaking.
+    rng = np.random.default_rng(seed)
+    common = len(ACCORDS) - len(RARE_ACCORDS)
+    picks = np.argsort(rng.random((rows, common), dtype=np.float32), axis=1)[:, :4]
+    for rare in range(common, len(ACCORDS)):
+        hit = rng.random(rows) < 0.03
+        picks[hit, rng.integers(0, 4, int(hit.sum()))] = rare
+    accords = np.array(ACCORDS, dtype=object)[picks]
+    if coarse_ratings:
+        ratings = rng.choice([0.0, 3.5, 4.0, 4.25], size=rows)
+    else:
+        ratings = np.clip(rng.normal(3.6, 0.5, rows), 1.0, 5.0).round(2)
+    return pd.DataFrame({
+        'Brand': pd.Categorical.from_codes(rng.integers(0, len(BRANDS), rows), BRANDS),
+        'Name': pd.Series(np.array(MOODS, dtype=object)[rng.integers(0, len(MOODS), rows)])
+                + ' No ' + pd.Series(np.arange(rows) % 100).astype(str),
+        'Gender': pd.Categorical.from_codes(rng.choice(len(GENDERS), rows, p=GENDER_SHARES), GENDERS),
+        'Rating Value': ratings,
+        'Main Accords': pd.Series(accords[:, 0]).str.cat([pd.Series(accords[:, i]) for i in range(1, 4)], sep=', '),
+    })
+
+
+def synthetic_query_texts(count, seed=7):
+    # Fixed, seeded: hint queries first, then 1-4 word mixes of accords, brands and moods
+    rng = np.random.default_rng(seed)
+    words = ACCORDS + [b.lower() for b in BRANDS] + MOODS
+    queries = list(HINT_QUERIES)
+    while len(queries) < count:
+        queries.append(' '.join(rng.choice(words, size=rng.integers(1, 5), replace=False)))
+    return queries
+
+
+def load_corpus(store_dir=None, rows=CORPUS_ROWS):
+    # Real store if available, otherwise a synthetic corpus of the same size
+    if store_dir:
+        from vector_store import load_store
+        vectors, _, meta = load_store(store_dir)
+        print(f"Corpus: {store_dir} ({meta['count']} x {meta['dim']})")
+        return np.asarray(vectors, dtype=np.float32)
+    print(f"Corpus: synthetic ({rows} x {EMBED_DIM})")
+    return synthetic_corpus(rows)
+
+
+def time_calls(fn, items, warmup=5):
+    for item in items[:warmup]:
+        fn(item)
+    timings = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings)
+
+
+def report(label, timings_ms):
+    p50, p95, p99 = np.percentile(timings_ms, [50, 95, 99])
+    print(f"{label:<32} p50 {p50:8.3f} ms | p95 {p95:8.3f} ms | p99 {p99:8.3f} ms | n={len(timings_ms)}")
+    return {'p50': p50, 'p95': p95, 'p99': p99}
+
+
+class StandInEncoder:
+    # Offline stand-in for SentenceTransformer: hashed bag-of-words vectors plus a
+    # simulated cost (fixed per call + per sentence) serialized on one lock, like
+    # a CPU transformer sharing the torch thread pool.
+    def __init__(self, dim=EMBED_DIM, call_ms=8.0, item_ms=0.4):
+        self.dim = dim
+        self.call_ms = call_ms
+        self.item_ms = item_ms
+        self._lock = threading.Lock()
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, sentences, convert_to_numpy=True, normalize_embeddings=True, **kwargs):
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        out = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for i, text in enumerate(sentences):
+            for word in str(text).lower().split():
+                h = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), 'little')
+                out[i, h % self.dim] += 1.0
+                out[i, (h >> 20) % self.dim] -= 0.5
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        out /= norms
+        with self._lock:
+            time.sleep((self.call_ms + self.item_ms * len(sentences)) / 1000.0)
+        return out[0] if single else out
@@ -0,0 +1,128 @@
+import argparse
+import json
+
+import numpy as np
+
+from common import StandInEncoder, synthetic_catalog
+from fields import FieldVectors, FIELDS, encode_fields
+from search_engine import SearchEngine
+
+# --- OFFLINE EVAL: soup embedding vs weighted multi-field ranking ---
+# Labelled queries are {"query": ..., "relevant": [row ids]}; pass a hand-labelled
+# file with --labels, otherwise a silver set is derived from the catalog metadata
+# with fixed templates (brand, accord pair, brand + accord, exact name).
+# Metrics over the top-k: recall@k (against min(k, |relevant|)), MRR and nDCG@k.
+#   python benchmarks/eval_fields.py                      # real store + model (built with --fields)
+#   python benchmarks/eval_fields.py --synthetic 20000    # offline, stand-in encoder
+
+PRESETS = ['accords:1,name:1,brand:1', 'accords:0.6,name:0.2,brand:0.2', 'accords:0.4,name:0.3,brand:0.3']
+
+
+def accord_list(text):
+    return [a.strip().lower() for a in str(text).split(',') if a.strip()]
+
+
+def silver_queries(df, count=200, seed=11):
+    rng = np.random.default_rng(seed)
+    brands = df['Brand'].astype(str).str.lower().to_numpy()
+    names = df['Name'].astype(str).str.lower().to_numpy()
+    accords = [set(accord_list(a)) for a in df['Main Accords']]
+    queries = []
+    for i in range(count):
+        row = int(rng.integers(0, len(df)))
+        row_accords = sorted(accords[row])
+        kind = i % 4
+        if kind == 0:
+            query, relevant = brands[row], np.flatnonzero(brands == brands[row])
+        elif kind == 1 and len(row_accords) >= 2:
+            a, b = rng.choice(row_accords, size=2, replace=False)
+            query = f"{a} {b}"
+            relevant = np.array([j for j, acc in enumerate(accords) if a in acc and b in acc])
+        elif kind == 2 and row_accords:
+            a = rng.choice(row_accords)
+            query = f"{brands[row]} {a}"
+            relevant = np.array([j for j, acc in enumerate(accords) if a in acc and brands[j] == brands[row]])
+        else:
+            query, relevant = names[row], np.flatnonzero(names == names[row])
+        queries.append({'query': query, 'relevant': relevant.tolist()})
+    return queries
+
+
+def evaluate(ranked, relevant, k):
+    relevant = set(relevant)
+    hits = np.array([int(r) in relevant for r in ranked[:k]], dtype=np.float64)
+    recall = hits.sum() / min(k, len(relevant))
+    first = np.flatnonzero(hits)
+    mrr = 1.0 / (first[0] + 1) if len(first) else 0.0
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    ideal = discounts[:min(k, len(relevant))].sum()
+    ndcg = (hits * discounts[:len(hits)]).sum() / ideal
+    return recall, mrr, ndcg
+
+
+def load_real(csv_path, store_dir):
+    from dataset import load_dataset
+    from fields import load_field_vectors
+    from model_loader import load_model
+    from vector_store import load_store
+
+    df = load_dataset(csv_path)
+    vectors, _, meta = load_store(store_dir)
+    fields = load_field_vectors(store_dir)
+    if fields is None:
+        raise SystemExit(f"{store_dir} has no field embeddings: rebuild with generate_embeddings.py --fields")
+    return df, vectors, fields, load_model(meta['model_name'])
+
+
+def load_synthetic(rows):
+    df = synthetic_catalog(rows)
+    model = StandInEncoder(call_ms=0.0, item_ms=0.0)
+    soup = (df['Brand'].astype(str) + " " + df['Name'].astype(str) + " " + df['Main Accords'].astype(str)).tolist()
+    vectors = model.encode(soup)
+    fields = FieldVectors(encode_fields(df, model.encode), list(FIELDS))
+    return df, vectors, fields, model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soup vs multi-field ranking evaluation")
+    parser.add_argument('--labels', default=None, help="JSON list of {query, relevant} (default: silver set)")
+    parser.add_argument('--synthetic', type=int, default=0, help="rows of a synthetic catalog (offline run)")
+    parser.add_argument('--csv', default='scentsational_data.csv')
+    parser.add_argument('--store', default='scent_store')
+    parser.add_argument('--queries', type=int, default=200, help="silver queries to derive")
+    parser.add_argument('--weights', default=None, help="extra presets, ';'-separated, e.g. 'accords:0.7,brand:0.3'")
+    parser.add_argument('--k', type=int, default=15)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        df, vectors, fields, model = load_synthetic(args.synthetic)
+        print(f"Catalog: synthetic ({len(df)} rows, stand-in encoder)")
+    else:
+        df, vectors, fields, model = load_real(args.csv, args.store)
+        print(f"Catalog: {args.csv} ({len(df)} rows)")
+
+    if args.labels:
+        with open(args.labels) as f:
+            labelled = json.load(f)
+    else:
+        labelled = silver_queries(df, args.queries)
+    labelled = [q for q in labelled if q['relevant']]
+    print(f"Queries: {len(labelled)} labelled")
+
+    engine = SearchEngine(vectors, model, normalized=True, fields=fields)
+    query_vecs = engine.encode([q['query'] for q in labelled])
+    presets = PRESETS + (args.weights.split(';') if args.weights else [])
+
+    runs = {'soup': engine.search_vectors(query_vecs, args.k)}
+    for preset in presets:
+        runs[preset] = engine.search_fields(query_vecs, preset, args.k)
+
+    print(f"{'ranking':<36} {'recall@' + str(args.k):>10} {'MRR':>8} {'nDCG@' + str(args.k):>9}")
+    for label, results in runs.items():
+        scores = np.array([evaluate(ids, q['relevant'], args.k) for (ids, _), q in zip(results, labelled)])
+        recall, mrr, ndcg = scores.mean(axis=0)
+        print(f"{label:<36} {recall:>10.3f} {mrr:>8.3f} {ndcg:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
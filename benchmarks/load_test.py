@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+from aiohttp import ClientSession, ClientTimeout
+
+# --- LOAD TEST for server.py: QPS and tail latency at a fixed concurrency ---
+# python server.py &   then   python benchmarks/load_test.py --concurrency 32 --duration 30
+
+QUERIES = ["Old library with cognac", "Walk in a rainy forest", "Warm Spicy Vanilla", "Fresh Citrus & Wood",
+           "vanilla", "fresh citrus", "oud", "dark woody leather", "powdery iris", "sea salt and sage",
+           "smoky incense church", "green tea and fig", "sweet gourmand caramel", "clean white musk"]
+
+
+async def worker(session, url, deadline, latencies, errors, mode):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if mode == 'batch':
+                payload = {'queries': random.sample(QUERIES, 8), 'k': 15}
+                async with session.post(f"{url}/batch_search", json=payload) as resp:
+                    await resp.read()
+                    ok = resp.status == 200
+            elif mode == 'similar':
+                async with session.get(f"{url}/similar/{random.randrange(1000)}") as resp:
+                    await resp.read()
+                    ok = resp.status == 200
+            else:
+                async with session.get(f"{url}/search", params={'q': random.choice(QUERIES)}) as resp:
+                    await resp.read()
+                    ok = resp.status == 200
+        except Exception:
+            ok = False
+        if ok:
+            latencies.append((time.perf_counter() - start) * 1000)
+        else:
+            errors.append(1)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="ScentSational API load test")
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20.0, help="seconds")
+    parser.add_argument('--mode', choices=['search', 'batch', 'similar'], default='search')
+    args = parser.parse_args()
+
+    latencies, errors = [], []
+    async with ClientSession(timeout=ClientTimeout(total=30)) as session:
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*[worker(session, args.url, deadline, latencies, errors, args.mode)
+                               for _ in range(args.concurrency)])
+        elapsed = time.perf_counter() - start
+
+    if not latencies:
+        print(f"No successful requests ({len(errors)} errors). Is server.py running at {args.url}?")
+        return
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"mode={args.mode} concurrency={args.concurrency} duration={elapsed:.1f}s")
+    print(f"requests {len(latencies)} | errors {len(errors)} | QPS {len(latencies) / elapsed:.1f}")
+    print(f"latency p50 {p50:.1f} ms | p95 {p95:.1f} ms | p99 {p99:.1f} ms | max {max(latencies):.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+import hashlib
+import os
+
+# --- RESULT CARD HTML ---
+# Pure string building, shared by both render modes of app.py:
+#   cards  one st.markdown per card inside three st.columns (streams in card by card)
+#   grid   the whole page of cards as one CSS-grid HTML block: one websocket delta
+# Kept free of Streamlit so benchmarks/bench_render.py can size the payloads.
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+STYLESHEET = 'scentsational.css'
+RENDER_MODES = ('grid', 'cards')
+
+
+def stylesheet_path():
+    return os.path.join(STATIC_DIR, STYLESHEET)
+
+
+def stylesheet_link():
+    # Streamlit serves ./static at app/static/ (enableStaticServing); the content
+    # hash in the query string busts the browser cache when the stylesheet changes
+    with open(stylesheet_path(), 'rb') as f:
+        version = hashlib.blake2b(f.read(), digest_size=4).hexdigest()
+    return f'<link rel="stylesheet" href="app/static/{STYLESHEET}?v={version}">'
+
+
+def stylesheet_inline():
+    with open(stylesheet_path(), encoding='utf-8') as f:
+        return f"<style>\n{f.read()}</style>"
+
+
+def get_initials(text):
+    if not text: return "SC"
+    words = str(text).split()
+    if not words: return "SC"
+    if len(words) == 1:
+        return words[0][:2].upper()
+    return (words[0][0] + words[-1][0]).upper()
+
+
+def card_html(row, row_id, raw_score):
+    brand = str(row['Brand']).replace('"', '').replace("'", "")
+    name = str(row['Name']).replace('"', '').replace("'", "")
+    notes = str(row['Main Accords']).replace("-", " ").replace('"', '')
+    if len(notes) > 50: notes = notes[:50] + "..."
+
+    rating = float(row.get('Rating Value', 0))
+    link = row.get('url', '#')
+
+    gender = str(row.get('Gender', 'Unisex')).capitalize()
+    year = str(row.get('Year', ''))
+    meta_info = f"{gender}"
+    if year: meta_info += f" &bull; {year}"
+
+    initials = get_initials(brand)
+    visual_score = int(min(98, max(50, raw_score * 180)))
+
+    return f"""<div class="perfume-card"><div class="brand-emblem">{initials}</div><div style="width:100%"><div class="row-brand">{brand}</div><div class="row-name">{name}</div><div class="row-meta">{meta_info}</div><div class="row-rating">★ {rating:.2f}</div><div class="match-wrapper"><div class="match-header"><span>Vibe Match</span><span>{visual_score}%</span></div><div class="bar-bg"><div class="bar-fill" style="width:{visual_score}%"></div></div><div class="match-explain">Analyzed via Scent Profile</div></div><div class="row-notes">{notes}</div></div><a href="{link}" target="_blank" class="gold-btn">FRAGRANTICA</a><a href="?similar={int(row_id)}" target="_self" class="similar-link">More Like This</a></div>"""
+
+
+def grid_html(df, ids, scores):
+    # All cards of a page in one block; CSS grid replaces the three st.columns
+    cards = [card_html(df.iloc[int(idx)], idx, score) for idx, score in zip(ids, scores)]
+    return f'<div class="result-grid">{"".join(cards)}</div>'
@@ -0,0 +1,169 @@
+import csv
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from vector_store import file_sha256
+
+logger = logging.getLogger("scentsational")
+
+# --- DATASET LOADING ---
+# The raw CSV is parsed and cleaned once into a typed Parquet artifact
+# (categorical Brand/Gender). Later starts read the artifact directly and only
+# rebuild it when the CSV changes: mtime/size first, content hash second.
+
+CSV_PATH = 'scentsational_data.csv'
+ACCORD_COLS = ['mainaccord1', 'mainaccord2', 'mainaccord3', 'mainaccord4', 'mainaccord5']
+ARTIFACT_VERSION = 1
+
+
+def sniff_delimiter(path, encoding='latin1'):
+    # Same rule as pandas' sep=None: csv.Sniffer on the first line
+    with open(path, encoding=encoding, newline='') as f:
+        first_line = f.readline()
+    try:
+        return csv.Sniffer().sniff(first_line).delimiter
+    except csv.Error:
+        return None
+
+
+def read_raw_csv(path=CSV_PATH, chunk_size=None):
+    # Fast C-engine parse with the delimiter sniffed once; python engine only as fallback
+    delimiter = sniff_delimiter(path)
+    if delimiter is None:
+        return pd.read_csv(path, sep=None, engine='python', encoding='latin1', chunksize=chunk_size)
+    return pd.read_csv(path, sep=delimiter, engine='c', encoding='latin1', chunksize=chunk_size)
+
+
+def join_accords(df, columns, sep):
+    # Vectorized equivalent of sep.join(row.dropna().astype(str)) over the given columns
+    joined = pd.Series('', index=df.index, dtype=object)
+    started = pd.Series(False, index=df.index)
+    for col in columns:
+        present = df[col].notna()
+        text = df[col].astype(str).where(present, '')
+        joined = joined + np.where(started & present, sep, '') + text
+        started |= present
+    return joined
+
+
+def clean_text(series):
+    # str(x).replace('-', ' ').title(), empty string for missing values
+    cleaned = series.astype(str).str.replace('-', ' ', regex=False).str.title()
+    return cleaned.where(series.notna(), '')
+
+
+def clean_dataset(df):
+    df.columns = df.columns.str.strip()
+
+    # MAPPING
+    cols = df.columns.tolist()
+    brand_col = next((c for c in cols if 'brand' in c.lower()), 'Brand')
+    name_col = next((c for c in cols if 'perfume' in c.lower() or 'name' in c.lower()), 'Name')
+    rating_col = next((c for c in cols if 'rating' in c.lower()), 'Rating Value')
+    gender_col = next((c for c in cols if 'gender' in c.lower()), 'Gender')
+    year_col = next((c for c in cols if 'year' in c.lower() or 'date' in c.lower() or 'launch' in c.lower()), 'Year')
+
+    df = df.rename(columns={
+        brand_col: 'Brand', name_col: 'Name',
+        rating_col: 'Rating Value', gender_col: 'Gender', year_col: 'Year'
+    })
+
+    # Combine Notes
+    existing_accords = [c for c in ACCORD_COLS if c in df.columns]
+    if existing_accords:
+        df['Main Accords'] = join_accords(df, existing_accords, ', ')
+    else:
+        notes_col = next((c for c in cols if 'accord' in c.lower() or 'note' in c.lower()), 'Main Accords')
+        df = df.rename(columns={notes_col: 'Main Accords'})
+
+    # Clean Data
+    df['Rating Value'] = df['Rating Value'].astype(str).str.replace(',', '.', regex=False)
+    df['Rating Value'] = pd.to_numeric(df['Rating Value'], errors='coerce').fillna(0)
+
+    df['Brand'] = clean_text(df['Brand'])
+    df['Name'] = clean_text(df['Name'])
+
+    if 'Gender' not in df.columns: df['Gender'] = "Unisex"
+    else: df['Gender'] = df['Gender'].fillna("Unisex")
+
+    if 'Year' in df.columns:
+        years = pd.to_numeric(df['Year'], errors='coerce').fillna(0).astype(int)
+        df['Year'] = np.where(years > 1000, years.astype(str), "")
+    else:
+        df['Year'] = ""
+
+    if 'Main Accords' not in df.columns: df['Main Accords'] = "Notes Unavailable"
+
+    df['Brand'] = df['Brand'].astype('category')
+    df['Gender'] = df['Gender'].astype(str).astype('category')
+    return df
+
+
+def artifact_paths(csv_path):
+    base = os.path.splitext(csv_path)[0]
+    return base + '.parquet', base + '.parquet.json'
+
+
+def _source_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def _write_artifact(df, csv_path, sha256):
+    parquet_path, meta_path = artifact_paths(csv_path)
+    df.to_parquet(parquet_path + '.tmp', index=False)
+    os.replace(parquet_path + '.tmp', parquet_path)
+    _write_artifact_meta(meta_path, csv_path, sha256)
+
+
+def _write_artifact_meta(meta_path, csv_path, sha256):
+    meta = {'version': ARTIFACT_VERSION, 'sha256': sha256, **_source_stamp(csv_path)}
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(meta_path + '.tmp', meta_path)
+
+
+def source_sha256(csv_path=CSV_PATH):
+    # Content hash of the CSV, from the artifact stamp when the file is unchanged
+    _, meta_path = artifact_paths(csv_path)
+    if os.path.exists(meta_path) and os.path.exists(csv_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        stamp = _source_stamp(csv_path)
+        if meta.get('mtime_ns') == stamp['mtime_ns'] and meta.get('size') == stamp['size'] and meta.get('sha256'):
+            return meta['sha256']
+    return file_sha256(csv_path)
+
+
+def load_dataset(csv_path=CSV_PATH):
+    parquet_path, meta_path = artifact_paths(csv_path)
+    if os.path.exists(parquet_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('version') == ARTIFACT_VERSION:
+            stamp = _source_stamp(csv_path)
+            if meta.get('mtime_ns') == stamp['mtime_ns'] and meta.get('size') == stamp['size']:
+                return pd.read_parquet(parquet_path)
+            # Touched but identical (e.g. fresh checkout): refresh the stamp only
+            sha256 = file_sha256(csv_path)
+            if sha256 == meta.get('sha256'):
+                _write_artifact_meta(meta_path, csv_path, sha256)
+                return pd.read_parquet(parquet_path)
+
+    df = clean_dataset(read_raw_csv(csv_path))
+    try:
+        _write_artifact(df, csv_path, file_sha256(csv_path))
+    except (ImportError, OSError) as e:
+        # Read-only filesystem or no Parquet engine: serve the cleaned frame uncached
+        logger.warning("dataset artifact not written (%s)", e)
+    return df
+
+
+if __name__ == "__main__":
+    frame = clean_dataset(read_raw_csv(CSV_PATH))
+    _write_artifact(frame, CSV_PATH, file_sha256(CSV_PATH))
+    print(f"SUCCESS! '{artifact_paths(CSV_PATH)[0]}' created ({len(frame)} perfumes).")
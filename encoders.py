@@ -0,0 +1,154 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from model_loader import MODEL_DIR, load_model, model_path, offline_mode
+from vector_store import DEFAULT_MODEL_NAME
+
+# --- ENCODER BACKENDS ---
+# Query and catalog text go through one interface, whatever runs the model:
+#   torch      sentence-transformers on PyTorch (model_loader.load_model)
+#   onnx       the same transformer exported to ONNX, run by onnxruntime with
+#              a `tokenizers` tokenizer: no torch import at startup
+#   onnx-int8  the ONNX export with dynamically quantized int8 weights
+# Every backend exposes encode(sentences, batch_size=, normalize_embeddings=,
+# convert_to_numpy=) and get_sentence_embedding_dimension(), so SearchEngine,
+# EncodeBatcher and generate_embeddings.py take any of them. onnxruntime and
+# tokenizers are optional; the export (python encoders.py --export) needs torch.
+# SCENT_ENCODER selects the backend (default torch).
+
+ENCODER_BACKENDS = ('torch', 'onnx', 'onnx-int8')
+ENCODER_ENV = 'SCENT_ENCODER'
+ONNX_FILES = {'onnx': 'model.onnx', 'onnx-int8': 'model_int8.onnx'}
+ENCODER_META_FILE = 'encoder_meta.json'
+MAX_SEQ_LENGTH = 256
+
+
+def default_backend(fallback='torch'):
+    # $SCENT_ENCODER when set, else fallback (engine: the backend the store was built with)
+    backend = os.environ.get(ENCODER_ENV) or fallback
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"{ENCODER_ENV}={backend!r}: expected one of {ENCODER_BACKENDS}")
+    return backend
+
+
+def onnx_dir(model_name=DEFAULT_MODEL_NAME):
+    return os.path.join(MODEL_DIR, model_name.split('/')[-1] + '-onnx')
+
+
+class OnnxEncoder:
+    # Transformer forward pass on onnxruntime + mean pooling, as in the
+    # sentence-transformers pipeline of all-MiniLM-L6-v2
+    def __init__(self, path, backend='onnx', threads=None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(path, ENCODER_META_FILE)) as f:
+            self.meta = json.load(f)
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(os.path.join(path, ONNX_FILES[backend]), options,
+                                            providers=['CPUExecutionProvider'])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(os.path.join(path, 'tokenizer.json'))
+        self.tokenizer.enable_truncation(self.meta.get('max_seq_length', MAX_SEQ_LENGTH))
+        self.tokenizer.enable_padding(pad_id=self.meta.get('pad_id', 0), pad_token=self.meta.get('pad_token', '[PAD]'))
+        self.backend = backend
+
+    def get_sentence_embedding_dimension(self):
+        return self.meta['dim']
+
+    def _forward(self, texts):
+        encoded = self.tokenizer.encode_batch(texts)
+        mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+        feeds = {'input_ids': np.array([e.ids for e in encoded], dtype=np.int64), 'attention_mask': mask,
+                 'token_type_ids': np.array([e.type_ids for e in encoded], dtype=np.int64)}
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+        # Mean over real tokens only
+        weights = mask[:, :, None].astype(np.float32)
+        return (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+
+    def encode(self, sentences, batch_size=32, normalize_embeddings=False, convert_to_numpy=True,
+               show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else [str(s) for s in sentences]
+        out = np.empty((len(sentences), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        # Length-sorted batches keep padding (and wasted compute) small
+        order = np.argsort([len(s) for s in sentences], kind='stable')
+        for start in range(0, len(sentences), batch_size):
+            rows = order[start:start + batch_size]
+            out[rows] = self._forward([sentences[i] for i in rows])
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            out /= norms
+        return out[0] if single else out
+
+
+def load_encoder(model_name=DEFAULT_MODEL_NAME, backend=None, offline=None):
+    backend = backend or default_backend()
+    if backend == 'torch':
+        return load_model(model_name, offline=offline)
+    path = onnx_dir(model_name)
+    if not os.path.exists(os.path.join(path, ONNX_FILES[backend])):
+        raise FileNotFoundError(f"No {backend} export at {path} (run: python encoders.py --export"
+                                f"{' --int8' if backend == 'onnx-int8' else ''})")
+    return OnnxEncoder(path, backend)
+
+
+def export_onnx(model_name=DEFAULT_MODEL_NAME, int8=False, opset=14):
+    # One-off build step (needs torch + transformers): ONNX graph, tokenizer and
+    # pooling metadata under models/<name>-onnx/, optionally an int8 copy
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    source = model_path(model_name)
+    if not os.path.isdir(source):
+        if offline_mode():
+            raise FileNotFoundError(f"Offline mode and no vendored model at {source} (run: python model_loader.py)")
+        source = model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+    out = onnx_dir(model_name)
+    os.makedirs(out, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(source)
+    model = AutoModel.from_pretrained(source).eval()
+    sample = tokenizer(["warm spicy vanilla", "fresh citrus and wood"], padding=True, return_tensors='pt')
+    names = [n for n in ('input_ids', 'attention_mask', 'token_type_ids') if n in sample]
+    axes = {n: {0: 'batch', 1: 'sequence'} for n in names}
+    axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+    with torch.no_grad():
+        torch.onnx.export(model, tuple(sample[n] for n in names), os.path.join(out, ONNX_FILES['onnx']),
+                          input_names=names, output_names=['last_hidden_state'], dynamic_axes=axes,
+                          opset_version=opset)
+    tokenizer.save_pretrained(out)  # writes tokenizer.json for the fast tokenizer
+
+    max_seq_length = MAX_SEQ_LENGTH
+    st_config = os.path.join(source, 'sentence_bert_config.json')
+    if os.path.exists(st_config):
+        with open(st_config) as f:
+            max_seq_length = json.load(f).get('max_seq_length', MAX_SEQ_LENGTH)
+    meta = {'model_name': model_name, 'dim': int(model.config.hidden_size), 'pooling': 'mean',
+            'max_seq_length': max_seq_length, 'pad_id': tokenizer.pad_token_id, 'pad_token': tokenizer.pad_token}
+    with open(os.path.join(out, ENCODER_META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    if int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(os.path.join(out, ONNX_FILES['onnx']), os.path.join(out, ONNX_FILES['onnx-int8']),
+                         weight_type=QuantType.QInt8)
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the sentence encoder to ONNX")
+    parser.add_argument('--export', action='store_true', help="write models/<name>-onnx/")
+    parser.add_argument('--int8', action='store_true', help="also write a dynamically quantized int8 model")
+    args = parser.parse_args()
+
+    if args.export:
+        print(f"Exported {DEFAULT_MODEL_NAME} to {export_onnx(int8=args.int8)}")
+    else:
+        parser.print_help()
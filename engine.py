@@ -0,0 +1,231 @@
+import logging
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ann_index import load_index
+from batcher import EncodeBatcher
+from dataset import CSV_PATH, load_dataset, source_sha256
+from encoders import default_backend, load_encoder
+from fields import load_field_vectors, parse_weights
+from filter_index import FilterIndex
+from lexical import LexicalIndex, reciprocal_rank_fusion
+from metrics import StageTimer
+from model_loader import LazyModel
+from neighbours import load_knn_graph
+from quantization import load_quantized, quantized_scan_enabled
+from query_cache import QueryCache
+from ranking import Reranker
+from search_engine import SearchEngine
+from spelling import QueryNormalizer
+from vector_store import DEFAULT_MODEL_NAME, STORE_DIR, load_store, read_meta, resolve_store, store_exists
+
+logger = logging.getLogger("scentsational")
+
+# --- SCENTSATIONAL ENGINE ---
+# Load + search + re-rank in one importable object, shared by the Streamlit page
+# (app.py) and the HTTP service (server.py). One instance per process holds the
+# dataset, the memory-mapped vectors, the model and the caches.
+
+LEGACY_PICKLE = 'scent_embeddings.pkl'
+CANDIDATES = 80  # semantic candidates handed to the re-ranker
+RESULT_FIELDS = ['Brand', 'Name', 'Gender', 'Year', 'Rating Value', 'Main Accords', 'url']
+
+
+def _timed(timings, phase, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    timings[phase] = time.perf_counter() - start
+    return result
+
+
+def _load_vectors(store_dir, pkl_path, has_store, quantized_scan=False):
+    # Memory-mapped store (shared page cache across workers); legacy pickle as fallback.
+    # Quantized codes are only opened when the quantized first-pass scan is asked for
+    if has_store:
+        embeddings, _, store_meta = load_store(store_dir)
+        codes = load_quantized(store_dir) if quantized_scan else None
+        return (embeddings, store_meta['normalized'], load_index(store_dir, embeddings),
+                codes, load_knn_graph(store_dir), load_field_vectors(store_dir))
+    with open(pkl_path, 'rb') as f:
+        embeddings = pickle.load(f)
+    return embeddings, False, None, None, None, None
+
+
+def _check_store(embeddings, store_meta, df, csv_path):
+    # Vectors are addressed by row position: a store built from another version of
+    # the CSV misaligns every filter mask and returns the wrong perfumes
+    if len(embeddings) != len(df):
+        raise ValueError(f"Vector store has {len(embeddings)} rows but {csv_path} has {len(df)}: "
+                         f"rebuild it with python generate_embeddings.py")
+    if store_meta is not None and store_meta.get('source_hash'):
+        if store_meta['source_hash'] != source_sha256(csv_path):
+            logger.warning("Vector store was built from a different %s (same row count): results may be stale, "
+                           "rebuild it with python generate_embeddings.py", csv_path)
+
+
+class ScentEngine:
+    def __init__(self, df, search, filters, reranker, graph=None, lexical=None, normalizer=None):
+        self.df = df
+        self.search_engine = search
+        self.filters = filters
+        self.reranker = reranker
+        self.graph = graph  # optional neighbours.NeighbourGraph
+        self.lexical = lexical  # optional lexical.LexicalIndex, fused with the semantic hits
+        self.normalizer = normalizer  # optional spelling.QueryNormalizer, applied before everything else
+        self.startup = {}  # phase -> seconds, filled by load()
+        self.encoder = 'torch'  # encoders.ENCODER_BACKENDS entry, set by load()
+
+    @classmethod
+    def load(cls, csv_path=CSV_PATH, store_dir=STORE_DIR, pkl_path=LEGACY_PICKLE,
+             batch_max_size=32, batch_max_wait_ms=2.0, lazy_model=True, backend=None, quantized_scan=None):
+        # Staged startup: the model (the long pole) loads on its own thread while the
+        # dataset and the vector store load side by side. With lazy_model the engine
+        # is returned before the model is ready; encodes wait for it, filters don't.
+        # backend: encoders.ENCODER_BACKENDS entry (default $SCENT_ENCODER, else the
+        # store's build backend); one that differs from the store's is logged
+        # quantized_scan: scan the store's --quantize codes first (default $SCENT_QUANTIZED_SCAN, off)
+        start = time.perf_counter()
+        timings = {}
+        store_dir = resolve_store(store_dir)
+        has_store = store_exists(store_dir)
+        store_meta = read_meta(store_dir) if has_store else None
+        model_name = store_meta['model_name'] if has_store else DEFAULT_MODEL_NAME
+        store_backend = store_meta.get('encoder', 'torch') if has_store else 'torch'
+        backend = backend or default_backend(store_backend)
+        if backend != store_backend:
+            logger.warning("Encoder %r differs from the store's %r: query and catalog vectors may not match",
+                           backend, store_backend)
+        quantized_scan = quantized_scan_enabled() if quantized_scan is None else quantized_scan
+        model = LazyModel(load_encoder, model_name, backend)
+
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup") as pool:
+            # Cleaned, typed Parquet artifact; rebuilt only when the CSV changes
+            dataset = pool.submit(_timed, timings, 'dataset', load_dataset, csv_path)
+            store = pool.submit(_timed, timings, 'store', _load_vectors, store_dir, pkl_path, has_store,
+                                quantized_scan)
+            df = dataset.result()
+            filters = _timed(timings, 'filters', FilterIndex, df)
+            reranker = _timed(timings, 'reranker', Reranker, df)
+            lexical = _timed(timings, 'lexical', LexicalIndex, df)
+            normalizer = _timed(timings, 'normalizer', QueryNormalizer.from_index, lexical)
+            embeddings, normalized, index, codes, graph, fields = store.result()
+        _check_store(embeddings, store_meta, df, csv_path)
+
+        if not lazy_model:
+            _timed(timings, 'model', model.wait)
+        if batch_max_size > 1:
+            # Concurrent single-query encodes are coalesced into one model call
+            model = EncodeBatcher(model, max_batch_size=batch_max_size, max_wait_ms=batch_max_wait_ms)
+        # Backends agree only to ~1e-3 (int8 less), so their cached query vectors are kept apart
+        cache = QueryCache(model_name if backend == 'torch' else f"{model_name}:{backend}")
+        search = SearchEngine(embeddings, model, normalized=normalized, index=index, cache=cache,
+                              codes=codes, fields=fields)
+        engine = cls(df, search, filters, reranker, graph=graph, lexical=lexical, normalizer=normalizer)
+        timings['ready'] = time.perf_counter() - start
+        engine.startup = timings
+        engine.encoder = backend
+        logger.info("startup: %s", " | ".join(f"{phase} {seconds:.2f}s" for phase, seconds in timings.items()))
+        return engine
+
+    @property
+    def model_ready(self):
+        # False while a lazily loaded model is still on its way (or failed)
+        return getattr(self.search_engine.model, 'ready', True)
+
+    def wait_for_model(self, timeout=None):
+        wait = getattr(self.search_engine.model, 'wait', None)
+        if wait is not None:
+            wait(timeout)
+
+    @property
+    def cache(self):
+        return self.search_engine.cache
+
+    def __len__(self):
+        return len(self.df)
+
+    def search(self, query, gender="All", min_rating=0.0, note="All Notes", k=15, timer=None, weights=None):
+        return self.batch_search([query], gender, min_rating, note, k, timer=timer, weights=weights)[0]
+
+    def batch_search(self, queries, gender="All", min_rating=0.0, note="All Notes", k=15, timer=None, weights=None):
+        # Ranked (ids, scores) per query; uncached queries are encoded in one batch.
+        # timer: optional metrics.StageTimer, the caller records it when the query is done
+        # weights: optional field weights ({'accords': .., 'name': .., 'brand': ..} or
+        # "accords:0.6,name:0.3,brand:0.1"); needs field vectors in the store, else the soup is used
+        timer = timer if timer is not None else StageTimer()
+        if self.normalizer is not None:
+            # Typos and spelling variants mapped to catalog words, so they share cache
+            # entries with the canonical query and reach BM25 and the re-rank as accords
+            with timer.stage('normalize'):
+                queries = [self.normalizer.normalize(q) for q in queries]
+        if weights is not None:
+            weights = parse_weights(weights) if self.search_engine.fields is not None else None
+        weights_key = tuple(sorted(weights.items())) if weights is not None else None
+        with timer.stage('cache'):
+            keys = [self.cache.results_key(q, gender, min_rating, note, weights_key) for q in queries]
+            results = [self.cache.get_results(key) for key in keys]
+        pending = [i for i, r in enumerate(results) if r is None]
+        if pending:
+            # Sidebar filters are applied as a mask before top-k
+            with timer.stage('filters'):
+                mask = self.filters.mask(gender, min_rating, note)
+            with timer.stage('encode'):
+                query_vecs = self.search_engine.encode([queries[i] for i in pending])
+            with timer.stage('search'):
+                if weights is not None:
+                    hits = self.search_engine.search_fields(query_vecs, weights, k=CANDIDATES, mask=mask)
+                else:
+                    hits = self.search_engine.search_vectors(query_vecs, k=CANDIDATES, mask=mask)
+            for i, query_vec, (hit_ids, hit_scores) in zip(pending, query_vecs, hits):
+                fused = None
+                if self.lexical is not None:
+                    with timer.stage('lexical'):
+                        hit_ids, hit_scores, fused = self._fuse(queries[i], query_vec, hit_ids, mask, weights)
+                # Re-rank (HIERARCHY LOGIC V10.0: match_count, ai_score, name_match, rating)
+                with timer.stage('rerank'):
+                    results[i] = self.reranker.rank(hit_ids, hit_scores, queries[i], fused=fused)
+                self.cache.put_results(keys[i], *results[i])
+        return [(ids[:k], scores[:k]) for ids, scores in results]
+
+    def _fuse(self, query, query_vec, hit_ids, mask, weights=None):
+        # Union of semantic and BM25 candidates, ordered by reciprocal rank fusion, so
+        # an exact brand/accord hit the embedding ranked past CANDIDATES still competes
+        lexical_ids, _ = self.lexical.search(query, CANDIDATES, mask=mask)
+        ids, fused = reciprocal_rank_fusion([hit_ids, lexical_ids])
+        # Every candidate keeps its semantic score (lexical-only ones are scored here)
+        return ids, self.search_engine.score_rows(query_vec, ids, weights), fused
+
+    def similar(self, row_id, k=15, gender="All", min_rating=0.0, note="All Notes", min_hits=None):
+        # Nearest perfumes to an existing row, no model encode needed.
+        # min_hits: fewest graph neighbours (after filters) accepted before scanning (default k)
+        if not 0 <= row_id < len(self.df):
+            raise IndexError(f"No perfume with id {row_id}")
+        mask = self.filters.mask(gender, min_rating, note)
+        if self.graph is not None:
+            # O(k) read of the precomputed graph; fall back to a scan if filters thin it out
+            ids, scores = self.graph.neighbours(row_id, k, mask=mask)
+            if len(ids) >= min(k, min_hits or k):
+                return ids, scores
+        mask = np.ones(len(self.df), dtype=bool) if mask is None else mask.copy()
+        mask[row_id] = False
+        query_vec = np.asarray(self.search_engine.vectors[row_id], dtype=np.float32)
+        return self.search_engine.search_vectors(query_vec, k, mask=mask)[0]
+
+    def records(self, ids, scores):
+        # JSON-ready result rows
+        columns = [c for c in RESULT_FIELDS if c in self.df.columns]
+        rows = self.df.iloc[np.asarray(ids, dtype=np.int64)][columns]
+        records = []
+        for (row_id, score), values in zip(zip(ids, scores), rows.itertuples(index=False)):
+            record = {'id': int(row_id), 'score': round(float(score), 4)}
+            for column, value in zip(columns, values):
+                if pd.isna(value):
+                    record[column] = None
+                else:
+                    record[column] = float(value) if column == 'Rating Value' else str(value)
+            records.append(record)
+        return records
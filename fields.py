@@ -0,0 +1,118 @@
+import json
+import os
+
+import numpy as np
+
+# --- MULTI-FIELD EMBEDDINGS ---
+# Besides the "soup" vectors (Brand + Name + Main Accords in one string), the
+# store can hold one embedding per field, row-aligned with vectors.npy:
+#   fields.npy  float32 (rows x fields x dim), each field L2-normalized
+# Rows are laid out field-major per perfume, so a row block reshapes for free to
+# (rows, fields * dim) and a weighted combination over all fields is a single
+# matrix product with the query repeated per field and scaled by its weight:
+#   score = sum_f w_f * (q . v_f)  ==  [v_1 .. v_F] . [w_1 q .. w_F q]
+# Weights are per request; they are normalized to sum to 1, so scores stay on
+# the cosine scale.
+
+FIELDS = {'accords': 'Main Accords', 'name': 'Name', 'brand': 'Brand'}
+FIELDS_FILE = 'fields.npy'
+FIELDS_META_FILE = 'fields_meta.json'
+SCAN_BLOCK = 16384
+
+
+def parse_weights(spec):
+    # "accords:0.6,name:0.3,brand:0.1" -> {'accords': 0.6, 'name': 0.3, 'brand': 0.1}
+    if isinstance(spec, dict):
+        weights = {str(k): float(v) for k, v in spec.items()}
+    else:
+        weights = {}
+        for part in str(spec).split(','):
+            name, _, value = part.partition(':')
+            weights[name.strip()] = float(value)
+    unknown = set(weights) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {sorted(unknown)} (expected {list(FIELDS)})")
+    if any(w < 0 for w in weights.values()) or sum(weights.values()) <= 0:
+        raise ValueError("Field weights must be non-negative and not all zero")
+    return weights
+
+
+def encode_fields(frame, encode):
+    # (rows, fields, dim) normalized; each distinct field value is encoded once
+    # (brands and accord combinations repeat across thousands of rows)
+    out = None
+    for f, column in enumerate(FIELDS.values()):
+        values = frame[column].astype(str).to_numpy(str) if column in frame else np.full(len(frame), '')
+        uniques, inverse = np.unique(values, return_inverse=True)
+        vectors = np.asarray(encode(uniques.tolist()), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        if out is None:
+            out = np.empty((len(frame), len(FIELDS), vectors.shape[1]), dtype=np.float32)
+        out[:, f] = (vectors / norms)[inverse]
+    return out
+
+
+def create_field_vectors(store_dir, count, dim):
+    # Preallocated writable memmap for streaming builds
+    os.makedirs(store_dir, exist_ok=True)
+    return np.lib.format.open_memmap(os.path.join(store_dir, FIELDS_FILE), mode='w+',
+                                     dtype=np.float32, shape=(count, len(FIELDS), dim))
+
+
+def save_field_vectors(store_dir, vectors=None):
+    # Writes fields.npy (unless already streamed in place) and its header
+    if vectors is not None:
+        np.save(os.path.join(store_dir, FIELDS_FILE), np.ascontiguousarray(vectors, dtype=np.float32))
+    vectors = np.load(os.path.join(store_dir, FIELDS_FILE), mmap_mode='r')
+    meta = {'fields': list(FIELDS), 'count': int(vectors.shape[0]), 'dim': int(vectors.shape[2])}
+    with open(os.path.join(store_dir, FIELDS_META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+class FieldVectors:
+    def __init__(self, vectors, fields=tuple(FIELDS)):
+        self.vectors = vectors
+        self.fields = list(fields)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def weight_vector(self, weights):
+        weights = parse_weights(weights)
+        w = np.array([weights.get(name, 0.0) for name in self.fields], dtype=np.float32)
+        return w / w.sum()
+
+    def _query(self, query_vecs, weights):
+        # Each query repeated per field and scaled by the field weight: (queries, fields * dim)
+        query_vecs = np.atleast_2d(query_vecs).astype(np.float32)
+        w = self.weight_vector(weights)
+        return (query_vecs[:, None, :] * w[None, :, None]).reshape(len(query_vecs), -1)
+
+    def scores(self, query_vecs, weights, block=SCAN_BLOCK):
+        # Weighted scores (queries x rows), one pass over the matrix
+        query = self._query(query_vecs, weights)
+        out = np.empty((len(query), len(self.vectors)), dtype=np.float32)
+        for start in range(0, len(self.vectors), block):
+            chunk = np.asarray(self.vectors[start:start + block], dtype=np.float32)
+            out[:, start:start + len(chunk)] = query @ chunk.reshape(len(chunk), -1).T
+        return out
+
+    def score_rows(self, query_vec, ids, weights):
+        # Weighted scores of selected rows (ids in any order)
+        order = np.argsort(ids)
+        rows = np.asarray(self.vectors[np.asarray(ids)[order]], dtype=np.float32)
+        scores = np.empty(len(ids), dtype=np.float32)
+        scores[order] = rows.reshape(len(rows), -1) @ self._query(query_vec, weights)[0]
+        return scores
+
+
+def load_field_vectors(store_dir):
+    # None when the store was built without field embeddings
+    meta_path = os.path.join(store_dir, FIELDS_META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    return FieldVectors(np.load(os.path.join(store_dir, FIELDS_FILE), mmap_mode='r'), meta['fields'])
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from query_cache import LRUCache
+
+# --- FILTER INDEX ---
+# Sidebar filters as columns aligned with the embedding rows, so the search can
+# mask invalid rows *before* top-k selection instead of post-filtering a fixed
+# candidate list.
+#   gender_codes  int16 code per row (pd.factorize of the Gender column)
+#   ratings       float32 rating per row
+#   accord_bits   accord -> packed bitset of rows whose accords contain it, for
+#                 every accord of the catalog; other (client-supplied) notes are
+#                 matched on demand and kept in a bounded LRU (adhoc_bits)
+# It doubles as the sidebar facet index, built once with the dataset:
+#   genders       selectbox options ("All" + sorted genders)
+#   gender_rows   gender -> row ids
+#   note_counts   accord -> count, top_notes the 50 most frequent (sorted)
+
+ADHOC_NOTES = 256
+
+
+class FilterIndex:
+    def __init__(self, df):
+        self.size = len(df)
+
+        codes, genders = pd.factorize(df['Gender'].astype(str))
+        self.gender_codes = codes.astype(np.int16)
+        self.gender_lookup = {g: i for i, g in enumerate(genders)}
+        self.gender_rows = {g: np.flatnonzero(self.gender_codes == i) for g, i in self.gender_lookup.items()}
+        self.genders = ["All"] + sorted([g for g in genders if g != 'nan'])
+
+        self.ratings = pd.to_numeric(df['Rating Value'], errors='coerce').fillna(0).to_numpy(np.float32)
+
+        # Same matching rule as the UI: case-insensitive substring of 'Main Accords'
+        self._accords_lower = df['Main Accords'].astype(str).str.lower()
+        self.accord_bits = {}
+        self.adhoc_bits = LRUCache(ADHOC_NOTES)
+        for accord in self._accords_lower.str.split(',').explode().str.strip().unique():
+            if isinstance(accord, str) and len(accord) > 2:
+                self.accord_bits[accord] = self._build_bits(accord)
+
+        # Dominant Note facet: same tokenization the sidebar has always used
+        all_notes = ','.join(df['Main Accords'].astype(str)).replace('nan', '').split(',')
+        all_notes = [n.strip().title() for n in all_notes if len(n) > 2]
+        counts = pd.Series(all_notes, dtype=object).value_counts()
+        self.note_counts = counts.to_dict()
+        self.top_notes = sorted(counts.head(50).index.tolist())
+        for note in self.top_notes:
+            self.accord_mask(note)
+
+    def _build_bits(self, accord):
+        return np.packbits(self._accords_lower.str.contains(accord, regex=False).to_numpy(bool))
+
+    def accord_mask(self, note):
+        key = str(note).lower()
+        bits = self.accord_bits.get(key)
+        if bits is None:
+            bits = self.adhoc_bits.get(key)
+            if bits is None:
+                bits = self._build_bits(key)
+                self.adhoc_bits.put(key, bits)
+        return np.unpackbits(bits, count=self.size).astype(bool)
+
+    def mask(self, gender="All", min_rating=0.0, note="All Notes"):
+        # Returns None when no filter is active (search the whole corpus)
+        mask = None
+        if gender != "All":
+            mask = np.zeros(self.size, dtype=bool)
+            mask[self.gender_rows.get(str(gender), [])] = True
+        if min_rating > 0:
+            rating_ok = self.ratings >= min_rating
+            mask = rating_ok if mask is None else mask & rating_ok
+        if note != "All Notes":
+            note_ok = self.accord_mask(note)
+            mask = note_ok if mask is None else mask & note_ok
+        return mask
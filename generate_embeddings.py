@@ -1,67 +1,376 @@
-import pandas as pd
-from sentence_transformers import SentenceTransformer
-import pickle
+import numpy as np
+import argparse
 import os
+import shutil
+from dataset import read_raw_csv
+from ann_index import ANN_MIN_ROWS, build_index, save_index
+from quantization import QUANT_MODES, QuantizedVectors
+from fields import FIELDS, FIELDS_FILE, create_field_vectors, encode_fields, load_field_vectors, save_field_vectors
+from encoders import ENCODER_BACKENDS, ENCODER_ENV, default_backend, load_encoder
+from neighbours import KNN_FILES, KNN_K, build_knn_graph, load_knn_graph, save_knn_graph
+from vector_store import (STORE_DIR, DEFAULT_MODEL_NAME, save_store, load_store, read_meta, store_exists,
+                          load_hashes, content_hashes, file_sha256, staging_dir, publish_store,
+                          create_vectors, finalize_store)
 
-def generate_ai_brain():
-    print("--- 1. Loading Dataset ---")
-    try:
-        # Load CSV with flexible separator handling
-        df = pd.read_csv('scentsational_data.csv', sep=None, encoding='latin1', engine='python')
-        
-        # Clean column names (remove hidden spaces)
-        df.columns = df.columns.str.strip()
-        
-        # Rename 'Perfume' to 'Name' if needed
-        if 'Perfume' in df.columns:
-            df = df.rename(columns={'Perfume': 'Name'})
-            
-        print(f"Data loaded successfully. Total perfumes: {len(df)}")
-    except FileNotFoundError:
-        print("Error: 'scentsational_data.csv' not found.")
-        return
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        return
+CSV_PATH = 'scentsational_data.csv'
+ACCORD_COLS = ['mainaccord1', 'mainaccord2', 'mainaccord3', 'mainaccord4', 'mainaccord5']
+
+
+def read_csv(chunk_size=None):
+    # Load CSV with the separator sniffed once, C parser (an iterator of frames when chunk_size is set)
+    return read_raw_csv(CSV_PATH, chunk_size=chunk_size)
+
+
+def prepare_frame(df, verbose=True):
+    # Clean column names (remove hidden spaces)
+    df.columns = df.columns.str.strip()
+
+    # Rename 'Perfume' to 'Name' if needed
+    if 'Perfume' in df.columns:
+        df = df.rename(columns={'Perfume': 'Name'})
 
-    print("--- 2. Preprocessing & Merging Accords ---")
     # FIX: Combine individual accord columns into one 'Main Accords' column
-    accord_cols = ['mainaccord1', 'mainaccord2', 'mainaccord3', 'mainaccord4', 'mainaccord5']
     # Check which of these columns actually exist in the file
-    existing_cols = [c for c in accord_cols if c in df.columns]
-    
+    existing_cols = [c for c in ACCORD_COLS if c in df.columns]
+
     if existing_cols:
         # Join them with spaces
         df['Main Accords'] = df[existing_cols].apply(lambda x: ' '.join(x.dropna().astype(str)), axis=1)
     else:
         # Fallback if no accord columns found
-        print("Warning: No accord columns found. Using empty string for accords.")
+        if verbose:
+            print("Warning: No accord columns found. Using empty string for accords.")
         df['Main Accords'] = ""
 
-    print("--- 3. Creating Text Features (The Soup) ---")
     # Combining Brand, Name, and Notes into a single descriptive string
     df['text_features'] = (
-        df['Brand'].astype(str) + " " + 
-        df['Name'].astype(str) + " " + 
+        df['Brand'].astype(str) + " " +
+        df['Name'].astype(str) + " " +
         df['Main Accords'].astype(str)
     )
+    return df
+
+
+def reusable_vectors(store_dir, backend):
+    # Previous build with the same model and encoder backend (torch and ONNX vectors
+    # differ slightly, so they are never mixed), as (vectors, sorted hashes, row order), else None.
+    # Sorted arrays instead of a dict keep the lookup at ~24 bytes per row.
+    if not store_exists(store_dir):
+        return None
+    meta = read_meta(store_dir)
+    hashes = load_hashes(store_dir)
+    if hashes is None or meta['model_name'] != DEFAULT_MODEL_NAME or not meta['normalized']:
+        return None
+    if meta.get('encoder', 'torch') != backend:
+        print(f"Store was built with the {meta.get('encoder', 'torch')} encoder, not {backend}: re-encoding.")
+        return None
+    vectors, _, _ = load_store(store_dir)
+    order = np.argsort(hashes, kind='stable')
+    return vectors, hashes[order], order
+
 
-    print("--- 4. Downloading AI Model ---")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+def match_rows(hashes, previous):
+    # Row of each hash in the previous store, or -1 when new/changed
+    _, sorted_hashes, order = previous
+    if len(sorted_hashes) == 0:
+        return np.full(len(hashes), -1)
+    pos = np.searchsorted(sorted_hashes, hashes)
+    pos = np.minimum(pos, len(sorted_hashes) - 1)
+    found = sorted_hashes[pos] == hashes
+    return np.where(found, order[pos], -1)
 
-    print("--- 5. Generating Embeddings (Crunching numbers...) ---")
-    embeddings = model.encode(df['text_features'].tolist(), show_progress_bar=True)
 
-    print("--- 6. Saving the AI Brain (.pkl file) ---")
-    output_filename = 'scent_embeddings.pkl'
-    with open(output_filename, 'wb') as f:
-        pickle.dump(embeddings, f)
+def rows_unchanged(previous, old_rows):
+    # Every row reused from the previous store, same count and same order
+    if previous is None or old_rows is None or len(old_rows) != len(previous[0]):
+        return False
+    return bool(np.array_equal(old_rows, np.arange(len(old_rows))))
 
-    if os.path.exists(output_filename):
-        file_size = os.path.getsize(output_filename) / (1024 * 1024)
-        print(f"SUCCESS! '{output_filename}' created ({file_size:.2f} MB).")
+
+class ChunkEncoder:
+    # Single-process encode, or sentence-transformers' multi-process pool for workers > 1
+    # (torch backend only; onnxruntime already spreads one call over its intra-op threads)
+    def __init__(self, batch_size=64, workers=1, backend=None):
+        self.model = load_encoder(DEFAULT_MODEL_NAME, backend)
+        if not hasattr(self.model, 'start_multi_process_pool'):
+            workers = 1
+        if workers > 1:
+            # One torch thread pool per worker process: avoid oversubscribing the cores
+            os.environ.setdefault('OMP_NUM_THREADS', str(max(1, (os.cpu_count() or 1) // workers)))
+        self.batch_size = batch_size
+        self.pool = self.model.start_multi_process_pool(['cpu'] * workers) if workers > 1 else None
+
+    @property
+    def dim(self):
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts, show_progress_bar=False):
+        if self.pool is None:
+            return self.model.encode(texts, batch_size=self.batch_size, show_progress_bar=show_progress_bar,
+                                     normalize_embeddings=True)
+        vectors = self.model.encode_multi_process(texts, self.pool, batch_size=self.batch_size)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def close(self):
+        if self.pool is not None:
+            self.model.stop_multi_process_pool(self.pool)
+            self.pool = None
+
+
+def build_ann(staged, vectors, ann):
+    if ann == 'auto':
+        ann = 'ivf' if len(vectors) >= ANN_MIN_ROWS else 'none'
+    if ann == 'none':
+        print(f"Skipped: {len(vectors)} rows, exact search is used below {ANN_MIN_ROWS} rows.")
+    else:
+        index_meta = save_index(build_index(vectors, kind=ann), staged)
+        print(f"Index built: {index_meta}")
+
+
+def build_quantized(staged, vectors, quantize):
+    if quantize == 'none':
+        return
+    codes = QuantizedVectors.build(vectors, quantize)
+    codes.save(staged)
+    print(f"Quantized codes: {quantize} ({codes.nbytes / (1024 * 1024):.2f} MB)")
+
+
+def build_neighbours(staged, vectors, knn=None, unchanged=False):
+    # knn=None: top-KNN_K below ANN_MIN_ROWS only; the exact all-pairs build grows
+    # with rows^2 (about 25 s at 40k rows), so larger catalogs need an explicit --knn
+    if knn is None:
+        knn = KNN_K if len(vectors) < ANN_MIN_ROWS else 0
+        if not knn:
+            print(f"Neighbour graph skipped: {len(vectors)} rows (pass --knn N to build it anyway).")
+    if knn <= 0:
+        return
+    previous = load_knn_graph(STORE_DIR) if unchanged else None
+    if previous is not None and previous.k == min(knn, len(vectors) - 1) and len(previous.knn_ids) == len(vectors):
+        # Same rows in the same order as the published store: its graph still holds
+        for name in KNN_FILES:
+            shutil.copy2(os.path.join(STORE_DIR, name), os.path.join(staged, name))
+        print(f"Neighbour graph: rows unchanged, reused top-{previous.k}")
+        return
+    knn_ids, knn_scores = build_knn_graph(vectors, k=knn)
+    meta = save_knn_graph(staged, knn_ids, knn_scores)
+    print(f"Neighbour graph: top-{meta['k']} for {meta['rows']} perfumes")
+
+
+def report_saved(total, encoded):
+    vectors_path = os.path.join(STORE_DIR, 'vectors.npy')
+    fields_path = os.path.join(STORE_DIR, FIELDS_FILE)
+    if os.path.exists(vectors_path):
+        file_size = os.path.getsize(vectors_path) / (1024 * 1024)
+        print(f"SUCCESS! '{STORE_DIR}/' created ({file_size:.2f} MB).")
+        if os.path.exists(fields_path):
+            print(f"Field vectors: {os.path.getsize(fields_path) / (1024 * 1024):.2f} MB ({FIELDS_FILE})")
+        print(f"Rows reused: {total - encoded} | rows encoded: {encoded}")
     else:
         print("Error: File was not saved.")
 
+
+def generate_ai_brain(ann='auto', full=False, batch_size=64, workers=1, quantize='none', knn=None,
+                      backend=None, fields=False):
+    backend = backend or default_backend()
+    print("--- 1. Loading Dataset ---")
+    try:
+        df = read_csv()
+        print(f"Data loaded successfully. Total perfumes: {len(df)}")
+    except FileNotFoundError:
+        print(f"Error: '{CSV_PATH}' not found.")
+        return
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        return
+
+    print("--- 2. Preprocessing & Merging Accords ---")
+    print("--- 3. Creating Text Features (The Soup) ---")
+    df = prepare_frame(df)
+
+    print("--- 4. Matching Against the Existing Store ---")
+    texts = df['text_features'].tolist()
+    hashes = content_hashes(texts)
+    embeddings = np.zeros((len(texts), 0), dtype=np.float32)
+    field_vectors = None
+    to_encode = np.arange(len(texts))
+    old_rows = None
+    previous = None if full else reusable_vectors(STORE_DIR, backend)
+    previous_fields = load_field_vectors(STORE_DIR) if fields and previous is not None else None
+    if previous is not None:
+        old_vectors = previous[0]
+        old_rows = match_rows(hashes, previous)
+        reused = old_rows >= 0
+        embeddings = np.empty((len(texts), old_vectors.shape[1]), dtype=np.float32)
+        embeddings[reused] = old_vectors[old_rows[reused]]
+        if previous_fields is not None:
+            field_vectors = np.empty((len(texts), len(FIELDS), old_vectors.shape[1]), dtype=np.float32)
+            field_vectors[reused] = previous_fields.vectors[old_rows[reused]]
+        to_encode = np.flatnonzero(~reused)
+        dropped = len(old_vectors) - len(np.unique(old_rows[reused]))
+        print(f"Reusing {int(reused.sum())} rows, encoding {len(to_encode)} new/changed, dropping {dropped} stale.")
+    else:
+        print(f"No reusable store found: encoding all {len(texts)} rows.")
+    # Field embeddings follow the soup rows, unless the previous store has none yet
+    if not fields:
+        field_rows = np.arange(0)
+    else:
+        field_rows = to_encode if field_vectors is not None else np.arange(len(texts))
+
+    if len(to_encode) or len(field_rows):
+        print("--- 5. Downloading AI Model ---")
+        encoder = ChunkEncoder(batch_size=batch_size, workers=workers, backend=backend)
+
+        print("--- 6. Generating Embeddings (soup" + (" + accords, name, brand fields" if fields else "") + ") ---")
+        try:
+            if len(to_encode):
+                fresh = encoder.encode([texts[i] for i in to_encode], show_progress_bar=True)
+                if embeddings.shape[1] == 0:
+                    embeddings = np.empty((len(texts), fresh.shape[1]), dtype=np.float32)
+                embeddings[to_encode] = fresh
+            if len(field_rows):
+                fresh_fields = encode_fields(df.iloc[field_rows], encoder.encode)
+                if field_vectors is None:
+                    field_vectors = np.empty((len(texts),) + fresh_fields.shape[1:], dtype=np.float32)
+                field_vectors[field_rows] = fresh_fields
+        finally:
+            encoder.close()
+    else:
+        print("--- 5/6. Nothing to encode: the store is up to date ---")
+
+    print("--- 7. Saving the AI Brain (memory-mapped vector store) ---")
+    staged = staging_dir(STORE_DIR)
+    save_store(staged, embeddings, model_name=DEFAULT_MODEL_NAME,
+               source_hash=file_sha256(CSV_PATH), normalized=True, hashes=hashes,
+               encoder=backend)
+    if fields:
+        save_field_vectors(staged, field_vectors)
+
+    print("--- 8. Building Search Indexes (ANN, quantized codes, neighbours) ---")
+    build_ann(staged, embeddings, ann)
+    build_quantized(staged, embeddings, quantize)
+    build_neighbours(staged, embeddings, knn, unchanged=rows_unchanged(previous, old_rows))
+
+    publish_store(staged, STORE_DIR)
+    report_saved(len(texts), len(to_encode))
+
+
+def generate_ai_brain_streaming(ann='auto', full=False, batch_size=64, workers=1, chunk_size=20000,
+                                quantize='none', knn=None, backend=None, fields=False):
+    # Bounded memory: one CSV chunk of text and vectors in flight, output written
+    # straight into a preallocated memmap in the staging directory.
+    backend = backend or default_backend()
+    print("--- 1. Scanning Dataset (hashing text features per chunk) ---")
+    try:
+        hashes = np.concatenate([
+            content_hashes(prepare_frame(chunk, verbose=(i == 0))['text_features'])
+            for i, chunk in enumerate(read_csv(chunk_size))
+        ])
+        print(f"Data scanned successfully. Total perfumes: {len(hashes)}")
+    except FileNotFoundError:
+        print(f"Error: '{CSV_PATH}' not found.")
+        return
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        return
+
+    print("--- 2. Matching Against the Existing Store ---")
+    previous = None if full else reusable_vectors(STORE_DIR, backend)
+    previous_fields = load_field_vectors(STORE_DIR) if fields and previous is not None else None
+    old_rows = match_rows(hashes, previous) if previous is not None else np.full(len(hashes), -1)
+    to_encode = int((old_rows < 0).sum())
+    print(f"Reusing {len(hashes) - to_encode} rows, encoding {to_encode} new/changed.")
+
+    print(f"--- 3. Starting Encoder ({workers} worker(s), batch size {batch_size}) ---")
+    need_encoder = to_encode or (fields and previous_fields is None)
+    encoder = ChunkEncoder(batch_size=batch_size, workers=workers, backend=backend) if need_encoder else None
+    dim = encoder.dim if encoder is not None else previous[0].shape[1]
+
+    print("--- 4. Streaming Embeddings Into the Store (soup" + (" + accords, name, brand fields" if fields else "")
+          + ") ---")
+    staged = staging_dir(STORE_DIR)
+    vectors = create_vectors(staged, len(hashes), dim)
+    field_vectors = create_field_vectors(staged, len(hashes), dim) if fields else None
+    offset = 0
+    try:
+        for chunk in read_csv(chunk_size):
+            frame = prepare_frame(chunk, verbose=False)
+            texts = frame['text_features'].tolist()
+            rows = old_rows[offset:offset + len(texts)]
+            reused = rows >= 0
+            out = np.empty((len(texts), dim), dtype=np.float32)
+            if reused.any():
+                out[reused] = previous[0][rows[reused]]
+            missing = np.flatnonzero(~reused)
+            if len(missing):
+                out[missing] = encoder.encode([texts[i] for i in missing])
+            vectors[offset:offset + len(texts)] = out
+
+            # Field embeddings in the same pass, reused on the same rows as the soup
+            if field_vectors is not None:
+                field_out = np.empty((len(texts), len(FIELDS), dim), dtype=np.float32)
+                field_missing = missing if previous_fields is not None else np.arange(len(texts))
+                if previous_fields is not None and reused.any():
+                    field_out[reused] = previous_fields.vectors[rows[reused]]
+                if len(field_missing):
+                    field_out[field_missing] = encode_fields(frame.iloc[field_missing], encoder.encode)
+                field_vectors[offset:offset + len(texts)] = field_out
+            offset += len(texts)
+            print(f"  {offset}/{len(hashes)} rows written")
+    finally:
+        if encoder is not None:
+            encoder.close()
+    vectors.flush()
+    if field_vectors is not None:
+        field_vectors.flush()
+    del vectors, field_vectors
+
+    print("--- 5. Saving the Store Header ---")
+    finalize_store(staged, model_name=DEFAULT_MODEL_NAME, source_hash=file_sha256(CSV_PATH),
+                   normalized=True, hashes=hashes, encoder=backend)
+    if fields:
+        save_field_vectors(staged)
+
+    print("--- 6. Building Search Indexes (ANN, quantized codes, neighbours) ---")
+    stored = np.load(os.path.join(staged, 'vectors.npy'), mmap_mode='r')
+    build_ann(staged, stored, ann)
+    build_quantized(staged, stored, quantize)
+    build_neighbours(staged, stored, knn, unchanged=rows_unchanged(previous, old_rows))
+    del stored
+
+    publish_store(staged, STORE_DIR)
+    report_saved(len(hashes), to_encode)
+
+
 if __name__ == "__main__":
-    generate_ai_brain()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the ScentSational vector store")
+    parser.add_argument('--ann', choices=['auto', 'ivf', 'hnsw', 'none'], default='auto',
+                        help=f"ANN index type ('auto' builds IVF from {ANN_MIN_ROWS} rows up)")
+    parser.add_argument('--full', action='store_true',
+                        help="re-encode every row instead of reusing unchanged vectors")
+    parser.add_argument('--stream', action='store_true',
+                        help="read the CSV in chunks and write vectors straight to disk (bounded memory)")
+    parser.add_argument('--batch-size', type=int, default=64, help="sentences per encode batch")
+    parser.add_argument('--workers', type=int, default=1, help="encoder processes (multi-process pool if > 1)")
+    parser.add_argument('--chunk-size', type=int, default=20000, help="CSV rows per chunk in --stream mode")
+    parser.add_argument('--quantize', choices=('none',) + QUANT_MODES, default='none',
+                        help="also store compact codes for the first-pass scan, used with SCENT_QUANTIZED_SCAN=1 "
+                             "(int8; float16 not recommended)")
+    parser.add_argument('--knn', type=int, default=None,
+                        help=f"neighbours per perfume in the 'More like this' graph (0 to skip; "
+                             f"default {KNN_K} below {ANN_MIN_ROWS} rows, none above)")
+    parser.add_argument('--encoder', choices=ENCODER_BACKENDS, default=None,
+                        help=f"encoder backend (default: ${ENCODER_ENV} or torch)")
+    parser.add_argument('--fields', action='store_true',
+                        help=f"also embed accords, name and brand separately for weighted search "
+                             f"({FIELDS_FILE} is {len(FIELDS)}x the size of vectors.npy; one extra encode per distinct value)")
+    args = parser.parse_args()
+
+    if args.stream:
+        generate_ai_brain_streaming(ann=args.ann, full=args.full, batch_size=args.batch_size,
+                                    workers=args.workers, chunk_size=args.chunk_size, quantize=args.quantize,
+                                    knn=args.knn, backend=args.encoder, fields=args.fields)
+    else:
+        generate_ai_brain(ann=args.ann, full=args.full, batch_size=args.batch_size, workers=args.workers,
+                          quantize=args.quantize, knn=args.knn, backend=args.encoder, fields=args.fields)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from ranking import query_terms
+from search_engine import top_k
+
+# --- LEXICAL INDEX (BM25) ---
+# Inverted index over accords, names and brands, built once with the dataset.
+# Postings are stored CSR-style and sorted by token:
+#   tokens    sorted vocabulary, token -> position via self.lookup
+#   offsets   postings of tokens[i] are rows[offsets[i]:offsets[i + 1]]
+#   rows      int32 row ids
+#   impacts   float32 precomputed BM25 weight of the token in that row
+# Field weights scale term frequencies (a brand hit counts more than an accord
+# hit), so a query is scored by summing impacts over its postings only; cost
+# grows with the posting lengths, not the corpus.
+
+FIELD_WEIGHTS = {'Main Accords': 1.0, 'Name': 1.5, 'Brand': 2.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    # rankings: id arrays, best first -> (ids, fused scores) best first
+    fused = {}
+    for ranking in rankings:
+        for rank, row_id in enumerate(np.asarray(ranking).tolist()):
+            fused[row_id] = fused.get(row_id, 0.0) + 1.0 / (k + rank + 1)
+    ids = np.fromiter(fused.keys(), dtype=np.int64, count=len(fused))
+    scores = np.fromiter(fused.values(), dtype=np.float64, count=len(fused))
+    order = np.argsort(-scores, kind='stable')
+    return ids[order], scores[order]
+
+
+class LexicalIndex:
+    def __init__(self, df, field_weights=FIELD_WEIGHTS, k1=BM25_K1, b=BM25_B):
+        self.size = len(df)
+        parts = []
+        for column, weight in field_weights.items():
+            if column not in df.columns:
+                continue
+            # Same tokenization as ranking.query_terms: lowercase words of 3+ characters
+            tokens = df[column].astype(str).str.lower().str.findall(r'\w{3,}').explode().dropna()
+            parts.append(pd.DataFrame({'row': tokens.index.to_numpy(np.int64),
+                                       'token': tokens.to_numpy(str), 'tf': weight}))
+        postings = pd.concat(parts, ignore_index=True)
+        postings = postings[postings['token'] != 'nan']
+        postings = postings.groupby(['token', 'row'], sort=True, as_index=False)['tf'].sum()
+
+        doc_len = np.bincount(postings['row'].to_numpy(), weights=postings['tf'].to_numpy(), minlength=self.size)
+        avg_len = doc_len.mean() if self.size else 1.0
+        tokens, starts, counts = np.unique(postings['token'].to_numpy(str), return_index=True, return_counts=True)
+        idf = np.log(1.0 + (self.size - counts + 0.5) / (counts + 0.5))
+
+        rows = postings['row'].to_numpy()
+        tf = postings['tf'].to_numpy()
+        norm = k1 * (1.0 - b + b * doc_len[rows] / avg_len)
+        impacts = np.repeat(idf, counts) * tf * (k1 + 1.0) / (tf + norm)
+
+        self.tokens = tokens
+        self.lookup = {token: i for i, token in enumerate(tokens.tolist())}
+        self.offsets = np.append(starts, len(rows)).astype(np.int64)
+        self.rows = rows.astype(np.int32)
+        self.impacts = impacts.astype(np.float32)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def postings(self, token):
+        i = self.lookup.get(token)
+        if i is None:
+            return self.rows[:0], self.impacts[:0]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.rows[start:end], self.impacts[start:end]
+
+    def scores(self, query):
+        # (row ids, BM25 scores) of every row matching at least one query term
+        hits = [self.postings(term) for term in query_terms(query)]
+        hits = [(rows, impacts) for rows, impacts in hits if len(rows)]
+        if not hits:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if len(hits) == 1:
+            return hits[0][0].astype(np.int64), hits[0][1]
+        rows = np.concatenate([rows for rows, _ in hits])
+        impacts = np.concatenate([impacts for _, impacts in hits])
+        if len(rows) * 8 > self.size:
+            # Long postings: a dense accumulator beats sorting them
+            dense = np.bincount(rows, weights=impacts, minlength=self.size)
+            ids = np.flatnonzero(dense)
+            return ids, dense[ids].astype(np.float32)
+        ids, inverse = np.unique(rows, return_inverse=True)
+        return ids.astype(np.int64), np.bincount(inverse, weights=impacts).astype(np.float32)
+
+    def search(self, query, k=15, mask=None):
+        # Top-k (ids, scores) by BM25; mask drops filtered rows before top-k
+        ids, scores = self.scores(query)
+        if mask is not None and len(ids):
+            keep = mask[ids]
+            ids, scores = ids[keep], scores[keep]
+        order, top_scores = top_k(scores, k)
+        return ids[order], top_scores
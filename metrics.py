@@ -0,0 +1,141 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- SEARCH INSTRUMENTATION ---
+# StageTimer times the stages of one query (cache, filters, encode, search,
+# lexical, rerank, render) and, once the query is done, feeds them into the
+# process-wide REGISTRY. The registry renders the Prometheus text format: on
+# server.py's GET /metrics, or on a side port for the Streamlit page
+# (SCENT_METRICS_PORT). Pure stdlib, no prometheus_client needed.
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Counter:
+    def __init__(self, name, help_text, label):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value, amount=1):
+        with self._lock:
+            self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for value, count in sorted(self.values.items()):
+            lines.append(f'{self.name}{{{self.label}="{value}"}} {count}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label, buckets=STAGE_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self.series = {}  # label value -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, seconds):
+        with self._lock:
+            series = self.series.setdefault(label_value, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {value: list(counts) for value, counts in self.series.items()}
+        for value, counts in sorted(series.items()):
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{self.label}="{value}",le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{self.label}="{value}",le="+Inf"}} {counts[-1]}')
+            lines.append(f'{self.name}_sum{{{self.label}="{value}"}} {counts[-2]:.6f}')
+            lines.append(f'{self.name}_count{{{self.label}="{value}"}} {counts[-1]}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help_text, label):
+        metric = Counter(name, help_text, label)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, label, buckets=STAGE_BUCKETS):
+        metric = Histogram(name, help_text, label, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+SEARCHES = REGISTRY.counter('scent_searches_total', "Queries served", 'source')
+STAGE_SECONDS = REGISTRY.histogram('scent_stage_seconds', "Time spent per query pipeline stage", 'stage')
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def record(self, source):
+        # Closes the query: adds 'total' and feeds every stage into the registry
+        self.stages['total'] = time.perf_counter() - self._start
+        SEARCHES.inc(source)
+        for name, seconds in self.stages.items():
+            STAGE_SECONDS.observe(name, seconds)
+        return self.stages
+
+    def log_line(self, event="search", **fields):
+        # One JSON object per query, ready for a log pipeline
+        record = {'event': event, **fields,
+                  'stages_ms': {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}}
+        return json.dumps(record, default=str)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port, host='0.0.0.0'):
+    # GET /metrics on a daemon thread; for processes without their own HTTP routes
+    httpd = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=httpd.serve_forever, name="metrics", daemon=True).start()
+    return httpd
@@ -0,0 +1,97 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from vector_store import DEFAULT_MODEL_NAME
+
+logger = logging.getLogger("scentsational")
+
+# --- MODEL LOADING ---
+# The sentence-transformer is the slowest part of a cold start. A copy vendored
+# under models/<name>/ (python model_loader.py) loads from disk with no hub
+# round-trip; SCENT_OFFLINE=1 forbids network access altogether, so a missing
+# vendored copy fails fast instead of hanging on the hub.
+#   LazyModel  loads on a background thread and blocks encode() until ready,
+#              so the dataset, facets and page can come up in the meantime.
+
+MODEL_DIR = os.environ.get('SCENT_MODEL_DIR', 'models')
+
+
+def offline_mode():
+    return os.environ.get('SCENT_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+
+def model_path(model_name=DEFAULT_MODEL_NAME):
+    return os.path.join(MODEL_DIR, model_name.split('/')[-1])
+
+
+def load_model(model_name=DEFAULT_MODEL_NAME, offline=None):
+    offline = offline_mode() if offline is None else offline
+    if offline:
+        # Read by huggingface_hub at import time, so set before the import below
+        os.environ['HF_HUB_OFFLINE'] = '1'
+        os.environ['TRANSFORMERS_OFFLINE'] = '1'
+    # Imported here: torch alone takes seconds, and this runs on the loader thread
+    from sentence_transformers import SentenceTransformer
+
+    local = model_path(model_name)
+    if os.path.isdir(local):
+        return SentenceTransformer(local, local_files_only=True)
+    if offline:
+        raise FileNotFoundError(f"Offline mode and no vendored model at {local} (run: python model_loader.py)")
+    return SentenceTransformer(model_name)
+
+
+def vendor_model(model_name=DEFAULT_MODEL_NAME):
+    from sentence_transformers import SentenceTransformer
+
+    path = model_path(model_name)
+    SentenceTransformer(model_name).save(path)
+    return path
+
+
+class LazyModel:
+    # Stand-in for the model while it loads; encode() and attribute access wait for it
+    def __init__(self, loader, *args, **kwargs):
+        self._future = Future()
+        self.load_seconds = None
+        self._thread = threading.Thread(target=self._load, args=(loader, args, kwargs),
+                                        name="model-loader", daemon=True)
+        self._thread.start()
+
+    def _load(self, loader, args, kwargs):
+        start = time.perf_counter()
+        try:
+            model = loader(*args, **kwargs)
+        except Exception as e:
+            logger.exception("model load failed")
+            self._future.set_exception(e)
+            return
+        self.load_seconds = time.perf_counter() - start
+        logger.info("startup: model ready in %.2fs", self.load_seconds)
+        self._future.set_result(model)
+
+    @property
+    def ready(self):
+        return self._future.done() and self._future.exception() is None
+
+    @property
+    def failed(self):
+        return self._future.done() and self._future.exception() is not None
+
+    def wait(self, timeout=None):
+        # The loaded model; re-raises the load error
+        return self._future.result(timeout)
+
+    def encode(self, sentences, **kwargs):
+        return self.wait().encode(sentences, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.wait(), name)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(f"Vendored {DEFAULT_MODEL_NAME} to {vendor_model()}")
@@ -0,0 +1,91 @@
+import json
+import os
+
+import numpy as np
+
+# --- PRECOMPUTED NEIGHBOUR GRAPH ("More like this") ---
+# Top-k neighbours of every perfume, computed offline with blocked matrix
+# products. Peak extra memory is about block_rows x block_cols x 12 bytes: the
+# float32 score block plus the int64 indices argpartition returns for it
+# (192 MB at the 2048 x 8192 default), independent of the catalog size:
+#   knn_ids.npy     int32 (rows x k) neighbour row ids, best first
+#   knn_scores.npy  float16 (rows x k) cosine scores
+# A lookup at request time is a single row read: O(k), no model encode.
+
+KNN_META_FILE = 'knn_meta.json'
+KNN_FILES = ('knn_ids.npy', 'knn_scores.npy', KNN_META_FILE)
+KNN_K = 50
+
+
+def _merge_top(best_ids, best_scores, ids, scores, k):
+    all_ids = np.concatenate([best_ids, ids], axis=1)
+    all_scores = np.concatenate([best_scores, scores], axis=1)
+    top = np.argpartition(all_scores, -k, axis=1)[:, -k:]
+    return np.take_along_axis(all_ids, top, axis=1), np.take_along_axis(all_scores, top, axis=1)
+
+
+def build_knn_graph(vectors, k=KNN_K, block_rows=2048, block_cols=8192):
+    n = len(vectors)
+    k = min(k, n - 1)
+    knn_ids = np.empty((n, k), dtype=np.int32)
+    knn_scores = np.empty((n, k), dtype=np.float16)
+
+    for r0 in range(0, n, block_rows):
+        rows = np.asarray(vectors[r0:r0 + block_rows], dtype=np.float32)
+        best_ids = np.empty((len(rows), 0), dtype=np.int64)
+        best_scores = np.empty((len(rows), 0), dtype=np.float32)
+        for c0 in range(0, n, block_cols):
+            cols = np.asarray(vectors[c0:c0 + block_cols], dtype=np.float32)
+            scores = rows @ cols.T
+            # A perfume is not its own neighbour
+            own = np.arange(r0, r0 + len(rows))
+            inside = (own >= c0) & (own < c0 + len(cols))
+            scores[np.flatnonzero(inside), own[inside] - c0] = -np.inf
+
+            take = min(k, scores.shape[1])
+            top = np.argpartition(scores, -take, axis=1)[:, -take:]
+            best_ids, best_scores = _merge_top(
+                best_ids, best_scores, top + c0, np.take_along_axis(scores, top, axis=1), min(k, best_ids.shape[1] + take))
+
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        knn_ids[r0:r0 + len(rows)] = np.take_along_axis(best_ids, order, axis=1)
+        knn_scores[r0:r0 + len(rows)] = np.take_along_axis(best_scores, order, axis=1)
+    return knn_ids, knn_scores
+
+
+def save_knn_graph(store_dir, knn_ids, knn_scores):
+    np.save(os.path.join(store_dir, 'knn_ids.npy'), knn_ids)
+    np.save(os.path.join(store_dir, 'knn_scores.npy'), knn_scores)
+    meta = {'k': int(knn_ids.shape[1]), 'rows': int(knn_ids.shape[0])}
+    with open(os.path.join(store_dir, KNN_META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+class NeighbourGraph:
+    def __init__(self, knn_ids, knn_scores):
+        self.knn_ids = knn_ids
+        self.knn_scores = knn_scores
+
+    @property
+    def k(self):
+        return self.knn_ids.shape[1]
+
+    def neighbours(self, row_id, k=15, mask=None):
+        # (ids, scores) best first; a mask drops filtered rows from the stored list
+        ids = np.asarray(self.knn_ids[row_id], dtype=np.int64)
+        scores = np.asarray(self.knn_scores[row_id], dtype=np.float32)
+        if mask is not None:
+            keep = mask[ids]
+            ids, scores = ids[keep], scores[keep]
+        return ids[:k], scores[:k]
+
+
+def load_knn_graph(store_dir):
+    # None when the store has no precomputed graph
+    if not os.path.exists(os.path.join(store_dir, KNN_META_FILE)):
+        return None
+    return NeighbourGraph(
+        np.load(os.path.join(store_dir, 'knn_ids.npy'), mmap_mode='r'),
+        np.load(os.path.join(store_dir, 'knn_scores.npy'), mmap_mode='r'),
+    )
@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# --- QUERY CACHE ---
+# Two caches keyed by the normalized query text:
+#   embeddings  query -> vector, bounded in-process LRU plus an optional sqlite
+#               tier shared between processes (keyed by model name)
+#   results     (query, filters) -> final ranked ids + scores, in-process LRU
+# Changing a sidebar filter reruns the script but reuses the cached embedding.
+
+QUERY_CACHE_DB_ENV = 'SCENT_QUERY_CACHE_DB'
+
+
+def normalize_query(query):
+    return ' '.join(str(query).lower().split())
+
+
+class LRUCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class DiskTier:
+    def __init__(self, path, model_name):
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_embeddings ("
+            "model TEXT NOT NULL, query TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, query))"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM query_embeddings WHERE model = ? AND query = ?",
+                (self.model_name, query),
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def put(self, query, vector):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_embeddings (model, query, vector) VALUES (?, ?, ?)",
+                (self.model_name, query, np.asarray(vector, dtype=np.float32).tobytes()),
+            )
+            self._conn.commit()
+
+
+class QueryCache:
+    def __init__(self, model_name, capacity=2048, results_capacity=4096, db_path=None):
+        self.model_name = model_name
+        self.embeddings = LRUCache(capacity)
+        self.results = LRUCache(results_capacity)
+        if db_path is None:
+            db_path = os.environ.get(QUERY_CACHE_DB_ENV)
+        self.disk = DiskTier(db_path, model_name) if db_path else None
+
+    def encode(self, queries, encode_fn):
+        # Encodes only the queries missing from both tiers, in one batch
+        keys = [normalize_query(q) for q in queries]
+        vectors = [self.embeddings.get(k) for k in keys]
+        if self.disk is not None:
+            for i, key in enumerate(keys):
+                if vectors[i] is None:
+                    vectors[i] = self.disk.get(key)
+                    if vectors[i] is not None:
+                        self.embeddings.put(key, vectors[i])
+
+        missing = sorted({k for k, v in zip(keys, vectors) if v is None})
+        if missing:
+            fresh = dict(zip(missing, np.asarray(encode_fn(missing), dtype=np.float32)))
+            for key, vector in fresh.items():
+                self.embeddings.put(key, vector)
+                if self.disk is not None:
+                    self.disk.put(key, vector)
+            vectors = [fresh[k] if v is None else v for k, v in zip(keys, vectors)]
+        return np.stack(vectors)
+
+    def results_key(self, query, *filters):
+        return (normalize_query(query),) + tuple(filters)
+
+    def get_results(self, key):
+        return self.results.get(key)
+
+    def put_results(self, key, ids, scores):
+        self.results.put(key, (np.asarray(ids), np.asarray(scores)))
+
+    def stats(self):
+        stats = {
+            'embedding_hits': self.embeddings.hits,
+            'embedding_misses': self.embeddings.misses,
+            'embedding_entries': len(self.embeddings),
+            'result_hits': self.results.hits,
+            'result_misses': self.results.misses,
+            'result_entries': len(self.results),
+        }
+        if self.disk is not None:
+            stats['disk_hits'] = self.disk.hits
+            stats['disk_misses'] = self.disk.misses
+        return stats
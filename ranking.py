@@ -0,0 +1,44 @@
+import re
+
+import numpy as np
+
+# --- COLUMNAR RE-RANKER ---
+# Hierarchy: (match_count, ai_score, name_match, rating), all descending.
+#   match_count  number of query words found in the accords text
+#   name_match   1 if any query word appears in "Name Brand"
+# Lowercased text columns are precomputed once, candidates are scored with
+# vectorized substring search and ordered with a single np.lexsort.
+
+
+def query_terms(query):
+    words = set(re.split(r'\W+', query.lower()))
+    return sorted(w for w in words if len(w) > 2)
+
+
+class Reranker:
+    def __init__(self, df):
+        self.notes_lower = np.array(df['Main Accords'].astype(str).str.lower().tolist(), dtype=str)
+        self.names_lower = np.array((df['Name'].astype(str) + " " + df['Brand'].astype(str)).str.lower().tolist(), dtype=str)
+        self.ratings = df['Rating Value'].to_numpy(np.float64)
+
+    def score(self, ids, query):
+        words = query_terms(query)
+        notes = self.notes_lower[ids]
+        names = self.names_lower[ids]
+        match_count = np.zeros(len(ids), dtype=np.int32)
+        name_match = np.zeros(len(ids), dtype=np.int32)
+        for word in words:
+            match_count += np.char.find(notes, word) >= 0
+            name_match |= np.char.find(names, word) >= 0
+        return match_count, name_match
+
+    def rank(self, ids, scores, query, fused=None):
+        # Returns (ids, scores) reordered; ties keep their semantic order.
+        # fused: optional hybrid retrieval score that takes the ai_score slot in the order
+        ids = np.asarray(ids)
+        scores = np.asarray(scores, dtype=np.float64)
+        key = scores if fused is None else np.asarray(fused, dtype=np.float64)
+        match_count, name_match = self.score(ids, query)
+        # np.lexsort sorts by the last key first; negate for a stable descending order
+        order = np.lexsort((-self.ratings[ids], -name_match, -key, -match_count))
+        return ids[order], scores[order]
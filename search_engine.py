@@ -0,0 +1,141 @@
+import numpy as np
+
+from ann_index import ANN_MIN_ROWS
+
+# Filters keeping under this fraction of the rows skip the ANN index and score
+# just those rows (cheaper than the widened probe, and exact)
+SUBSET_SCAN_BELOW = 0.05
+
+# --- SEMANTIC SEARCH ENGINE ---
+# The corpus is L2-normalized once, so cosine similarity becomes a single
+# matrix product and top-k selection is an O(n) np.argpartition.
+# An optional ANN index (ann_index.py) replaces the full scan on large corpora,
+# and optional quantized codes (quantization.py) make the scan itself compact.
+# With per-field vectors (fields.py) a request can rank by a weighted mix of
+# accords / name / brand similarity instead of the single soup vector.
+
+
+def l2_normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores, k):
+    # scores: (n,) -> (ids, scores) sorted by descending score
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    order = np.argsort(-scores[candidates], kind='stable')
+    ids = candidates[order]
+    return ids, scores[ids]
+
+
+class SearchEngine:
+    def __init__(self, vectors, model=None, normalized=False, index=None, exact_below=ANN_MIN_ROWS, cache=None,
+                 codes=None, fields=None):
+        # A normalized float32 store is used as-is (stays memory-mapped and shared);
+        # anything else is normalized into a private float32 copy once.
+        if normalized and vectors.dtype == np.float32:
+            self.vectors = vectors
+        else:
+            self.vectors = l2_normalize(vectors)
+        self.model = model
+        # Exact scan is both faster and exact on small corpora
+        self.index = index if index is not None and len(self.vectors) >= exact_below else None
+        self.cache = cache  # optional query_cache.QueryCache
+        self.codes = codes  # optional quantization.QuantizedVectors for the first-pass scan
+        self.fields = fields  # optional fields.FieldVectors for weighted multi-field search
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def _encode(self, queries):
+        vecs = self.model.encode(list(queries), convert_to_numpy=True, normalize_embeddings=True)
+        return np.asarray(vecs, dtype=np.float32)
+
+    def encode(self, queries):
+        if self.cache is not None:
+            return self.cache.encode(queries, self._encode)
+        return self._encode(queries)
+
+    def search_vectors(self, query_vecs, k=15, mask=None):
+        # mask: optional boolean array over corpus rows; invalid rows never reach top-k
+        query_vecs = l2_normalize(np.atleast_2d(query_vecs))
+        if self.index is not None:
+            return [self._search_ann(q, k, mask) for q in query_vecs]
+        return self._search_exact(query_vecs, k, mask)
+
+    def _search_ann(self, query_vec, k, mask):
+        # A filter keeping a fraction s of the rows leaves about s of every probed
+        # list / visited node, so the probe widens by 1/s to hold recall
+        allowed = len(self.vectors) if mask is None else int(np.count_nonzero(mask))
+        selectivity = allowed / max(len(self.vectors), 1)
+        if selectivity < SUBSET_SCAN_BELOW:
+            return self._search_rows(query_vec, k, np.flatnonzero(mask))
+        ids, scores = self.index.search(query_vec, k, mask=mask, widen=1.0 / selectivity)
+        # The probed lists can still come up short: fall back to the exact scan
+        if len(ids) < min(k, allowed):
+            return self._search_exact(query_vec[None, :], k, mask)[0]
+        return ids, scores
+
+    def _search_rows(self, query_vec, k, rows):
+        # Exact top-k among the given (sorted) row ids
+        order, scores = top_k(np.asarray(self.vectors[rows], dtype=np.float32) @ query_vec, k)
+        return rows[order], scores
+
+    def _search_exact(self, query_vecs, k, mask):
+        if self.codes is not None:
+            return self._search_quantized(query_vecs, k, mask)
+        scores = query_vecs @ self.vectors.T
+        if mask is None:
+            return [top_k(row, k) for row in scores]
+        k = min(k, int(np.count_nonzero(mask)))
+        scores[:, ~mask] = -np.inf
+        return [top_k(row, k) for row in scores]
+
+    def _search_quantized(self, query_vecs, k, mask):
+        # Scan the compact codes, then rescore a shortlist with the exact float32 rows
+        approx = self.codes.scores(query_vecs)
+        eligible = len(self.vectors)
+        if mask is not None:
+            eligible = int(np.count_nonzero(mask))
+            approx[:, ~mask] = -np.inf
+        k = min(k, eligible)
+        shortlist = min(eligible, k * self.codes.rescore)
+        results = []
+        for query_vec, row in zip(query_vecs, approx):
+            candidates = np.sort(top_k(row, shortlist)[0])
+            exact = np.asarray(self.vectors[candidates], dtype=np.float32) @ query_vec
+            order, scores = top_k(exact, k)
+            results.append((candidates[order], scores))
+        return results
+
+    def search_fields(self, query_vecs, weights, k=15, mask=None):
+        # Exact scan of the weighted field combination; weights: {'accords': .., 'name': .., 'brand': ..}
+        scores = self.fields.scores(l2_normalize(np.atleast_2d(query_vecs)), weights)
+        if mask is None:
+            return [top_k(row, k) for row in scores]
+        k = min(k, int(np.count_nonzero(mask)))
+        scores[:, ~mask] = -np.inf
+        return [top_k(row, k) for row in scores]
+
+    def score_rows(self, query_vec, ids, weights=None):
+        # Exact scores of selected rows: soup cosine, or the weighted field mix
+        ids = np.asarray(ids)
+        if weights is not None:
+            return self.fields.score_rows(query_vec, ids, weights)
+        order = np.argsort(ids)
+        scores = np.empty(len(ids), dtype=np.float32)
+        scores[order] = np.asarray(self.vectors[ids[order]], dtype=np.float32) @ query_vec
+        return scores
+
+    def search(self, queries, k=15, mask=None):
+        if isinstance(queries, str):
+            queries = [queries]
+        return self.search_vectors(self.encode(queries), k, mask=mask)
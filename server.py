@@ -0,0 +1,172 @@
+import argparse
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from batcher import EncodeBatcher
+from encoders import ENCODER_BACKENDS, ENCODER_ENV
+from engine import CANDIDATES, ScentEngine
+from fields import parse_weights
+from metrics import REGISTRY, StageTimer
+
+logger = logging.getLogger("scentsational")
+
+# --- HEADLESS SEARCH SERVICE ---
+# JSON API over the same ScentEngine the Streamlit page uses, so the Atelier
+# frontend can query "the Brain" directly. One engine (dataset, vectors, model)
+# per process; CPU-bound work runs on a small thread pool so the event loop
+# keeps accepting requests.
+#   GET  /search?q=...&gender=&min_rating=&note=&k=&cursor=&weights=accords:0.6,name:0.2,brand:0.2
+#   GET  /similar/{id}?k=
+#   POST /batch_search   {"queries": [...], "gender": ..., "min_rating": ..., "note": ..., "k": ..., "weights": {...}}
+#   GET  /health
+#   GET  /metrics   Prometheus text format (metrics.py)
+
+MAX_K = CANDIDATES  # the re-ranker only sees this many candidates
+MAX_BATCH = 64
+
+ENGINE = web.AppKey('engine', ScentEngine)
+EXECUTOR = web.AppKey('executor', ThreadPoolExecutor)
+
+
+def filter_params(source):
+    return {
+        'gender': source.get('gender', "All"),
+        'min_rating': float(source.get('min_rating', 0.0)),
+        'note': source.get('note', "All Notes"),
+        'k': max(1, min(MAX_K, int(source.get('k', 15)))),
+    }
+
+
+def field_weights(source):
+    # Optional per-request field weights (fields.py); None ranks by the soup vector
+    weights = source.get('weights')
+    return parse_weights(weights) if weights else None
+
+
+async def run_blocking(request, fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(request.app[EXECUTOR], lambda: fn(*args, **kwargs))
+
+
+async def search(request):
+    query = request.query.get('q', '').strip()
+    if not query:
+        raise web.HTTPBadRequest(text="Missing query parameter 'q'")
+    try:
+        params = filter_params(request.query)
+        cursor = max(0, int(request.query.get('cursor', 0)))
+        weights = field_weights(request.query)
+    except ValueError as e:
+        raise web.HTTPBadRequest(text=str(e))
+    engine = request.app[ENGINE]
+    timer = StageTimer()
+    # Pages after the first come from the cached ranked list: no re-encode or re-search
+    k = params.pop('k')
+    ids, scores = await run_blocking(request, engine.search, query, k=cursor + k, timer=timer, weights=weights,
+                                     **params)
+    ids, scores = ids[cursor:], scores[cursor:]
+    next_cursor = cursor + k if len(ids) == k else None
+    with timer.stage('serialize'):
+        response = web.json_response({'query': query, 'results': engine.records(ids, scores),
+                                      'next_cursor': next_cursor})
+    timer.record('api')
+    logger.info(timer.log_line(source='api', query_len=len(query), results=len(ids)))
+    return response
+
+
+async def similar(request):
+    try:
+        row_id = int(request.match_info['id'])
+        params = filter_params(request.query)
+    except ValueError as e:
+        raise web.HTTPBadRequest(text=str(e))
+    engine = request.app[ENGINE]
+    try:
+        ids, scores = await run_blocking(request, engine.similar, row_id, **params)
+    except IndexError as e:
+        raise web.HTTPNotFound(text=str(e))
+    return web.json_response({'id': row_id, 'results': engine.records(ids, scores)})
+
+
+async def batch_search(request):
+    try:
+        body = await request.json()
+        queries = body['queries']
+        if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+            raise TypeError("'queries' must be a list of strings")
+        params = filter_params(body)
+        weights = field_weights(body)
+    except (ValueError, KeyError, TypeError) as e:
+        raise web.HTTPBadRequest(text=f"Invalid body: {e}")
+    if not queries or len(queries) > MAX_BATCH:
+        raise web.HTTPBadRequest(text=f"'queries' must hold 1 to {MAX_BATCH} strings")
+    engine = request.app[ENGINE]
+    timer = StageTimer()
+    results = await run_blocking(request, engine.batch_search, queries, timer=timer, weights=weights, **params)
+    with timer.stage('serialize'):
+        response = web.json_response({'results': [
+            {'query': q, 'results': engine.records(ids, scores)} for q, (ids, scores) in zip(queries, results)
+        ]})
+    timer.record('api_batch')
+    logger.info(timer.log_line(event='batch_search', source='api_batch', queries=len(queries)))
+    return response
+
+
+async def health(request):
+    engine = request.app[ENGINE]
+    status = {'status': 'ok', 'perfumes': len(engine), 'model_ready': engine.model_ready, 'encoder': engine.encoder,
+              'field_weights': engine.search_engine.fields is not None,
+              'startup': {phase: round(seconds, 3) for phase, seconds in engine.startup.items()},
+              'cache': engine.cache.stats()}
+    model = engine.search_engine.model
+    if isinstance(model, EncodeBatcher):
+        status['batcher'] = model.stats()
+    return web.json_response(status)
+
+
+async def metrics(request):
+    return web.Response(text=REGISTRY.render(), content_type='text/plain')
+
+
+def create_app(engine=None, threads=16, batch_max_size=32, batch_max_wait_ms=2.0):
+    app = web.Application()
+    if engine is None:
+        engine = ScentEngine.load(batch_max_size=batch_max_size, batch_max_wait_ms=batch_max_wait_ms)
+    app[ENGINE] = engine
+    app[EXECUTOR] = ThreadPoolExecutor(max_workers=threads)
+    app.router.add_get('/search', search)
+    app.router.add_get('/similar/{id}', similar)
+    app.router.add_post('/batch_search', batch_search)
+    app.router.add_get('/health', health)
+    app.router.add_get('/metrics', metrics)
+
+    async def shutdown(app):
+        app[EXECUTOR].shutdown(wait=False)
+    app.on_cleanup.append(shutdown)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ScentSational search API")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--threads', type=int, default=16, help="worker threads for encode/search")
+    parser.add_argument('--batch-max-size', type=int, default=32, help="max queries per encode call (1 disables batching)")
+    parser.add_argument('--batch-max-wait-ms', type=float, default=2.0, help="max time a query waits for a batch")
+    parser.add_argument('--offline', action='store_true', help="load the vendored model only, never the hub")
+    parser.add_argument('--encoder', choices=ENCODER_BACKENDS, default=None,
+                        help=f"encoder backend (default: ${ENCODER_ENV}, else the one the store was built with)")
+    args = parser.parse_args()
+
+    if args.offline:
+        os.environ['SCENT_OFFLINE'] = '1'
+    if args.encoder:
+        os.environ[ENCODER_ENV] = args.encoder
+
+    logging.basicConfig(level=logging.INFO)
+    app = create_app(threads=args.threads, batch_max_size=args.batch_max_size, batch_max_wait_ms=args.batch_max_wait_ms)
+    web.run_app(app, host=args.host, port=args.port)
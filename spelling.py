@@ -0,0 +1,161 @@
+import re
+
+import numpy as np
+
+# --- QUERY NORMALIZATION (aliases + typo tolerance) ---
+# Maps misspelled or variant query words onto the catalog vocabulary (the
+# accord, name and brand tokens of lexical.LexicalIndex) before the query
+# cache, the encoder, BM25 and the re-rank see them: "vanila" -> "vanilla",
+# "oudh" -> "oud", "bergamotte" -> "bergamot".
+# Fuzzy lookup is a symmetric-delete index (as in SymSpell): every vocabulary
+# word is indexed under the strings left after deleting up to 1 character
+# (2 from LONG_WORD characters up); a query word generates its own deletes and
+# looks them up, and the candidates are verified with a bounded edit distance.
+# Delete strings are stored as sorted 64-bit hashes with the word they came
+# from, so the index is two numpy arrays and a lookup is one searchsorted.
+# Only plain typos are rewritten; valid words the catalog lacks are kept as typed:
+#   - words in the vocabulary, stopwords, short words and words with digits
+#   - inflections of a vocabulary word ("rainy", "smoky", "lights" next to
+#     "rain", "smoke", "light")
+#   - words containing or contained in a candidate ("wood" / "woody"): the
+#     re-rank already matches substrings
+#   - one vowel swapped for another below LONG_WORD characters: that is how
+#     real words differ ("sweat" / "sweet", "mask" / "musk"), so only
+#     consonant slips, dropped, doubled and swapped letters are corrected
+# Ties go to the word found in most perfumes.
+
+MIN_WORD = 4
+LONG_WORD = 7
+ALIASES = {
+    'oudh': 'oud', 'aoud': 'oud', 'agarwood': 'oud', 'bergamotte': 'bergamot', 'vanille': 'vanilla',
+    'ambre': 'amber', 'musc': 'musk', 'cuir': 'leather', 'tubereuse': 'tuberose',
+}
+VOWELS = frozenset('aeiouy')
+SUFFIXES = ('ies', 'es', 's', 'y', 'ed', 'ing', 'er', 'ish', 'ly')
+STOPWORDS = frozenset("""
+    and the with for from into like that this very some more less not but are was its
+    smell smells smelling scent scents perfume perfumes fragrance fragrances cologne
+""".split())
+
+
+def max_distance(length):
+    if length < MIN_WORD:
+        return 0
+    return 2 if length >= LONG_WORD else 1
+
+
+def deletes(word, distance):
+    # word plus every string reachable by removing up to `distance` characters
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def stems(word):
+    # Candidate base forms of an inflected word: "smoky" -> smok, smoke; "foggy" -> fogg, fog
+    found = set()
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            stem = word[:-len(suffix)]
+            found.update((stem, stem + 'e'))
+            if suffix == 'ies':
+                found.add(stem + 'y')
+            if len(stem) > 3 and stem[-1] == stem[-2]:
+                found.add(stem[:-1])
+    return found
+
+
+def vowel_swap(a, b):
+    # Same length, differing in exactly one position, vowel for vowel
+    if len(a) != len(b):
+        return False
+    diffs = [(x, y) for x, y in zip(a, b) if x != y]
+    return len(diffs) == 1 and diffs[0][0] in VOWELS and diffs[0][1] in VOWELS
+
+
+def edit_distance(a, b, limit):
+    # Optimal string alignment distance (adjacent swaps count 1), or limit + 1 past the limit
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class QueryNormalizer:
+    def __init__(self, words, frequencies, aliases=ALIASES):
+        # words: vocabulary (lowercase); frequencies: perfumes containing each word
+        self.words = list(words)
+        self.frequencies = np.asarray(frequencies, dtype=np.int64)
+        self.vocabulary = set(self.words)
+        self.aliases = {alias: word for alias, word in aliases.items() if word in self.vocabulary}
+        keys, owners = [], []
+        for i, word in enumerate(self.words):
+            if not word.isalpha():
+                continue
+            variants = deletes(word, max_distance(len(word)))
+            keys.extend(map(hash, variants))
+            owners.extend([i] * len(variants))
+        keys = np.array(keys, dtype=np.int64)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.owners = np.array(owners, dtype=np.int32)[order]
+
+    @classmethod
+    def from_index(cls, lexical):
+        # Vocabulary and document frequencies straight from the BM25 postings
+        return cls(lexical.tokens.tolist(), np.diff(lexical.offsets))
+
+    def __len__(self):
+        return len(self.words)
+
+    def correct(self, word):
+        # Canonical form of one lowercase word (the word itself when nothing matches)
+        if word in self.aliases:
+            return self.aliases[word]
+        limit = max_distance(len(word))
+        if word in self.vocabulary or word in STOPWORDS or not limit or not word.isalpha():
+            return word
+        if not stems(word).isdisjoint(self.vocabulary):
+            return word
+        probes = np.fromiter((hash(key) for key in deletes(word, limit)), dtype=np.int64)
+        starts = np.searchsorted(self.keys, probes, side='left')
+        ends = np.searchsorted(self.keys, probes, side='right')
+        hits = [self.owners[s:e] for s, e in zip(starts.tolist(), ends.tolist()) if e > s]
+        if not hits:
+            return word
+        best, best_rank = word, None
+        for i in np.unique(np.concatenate(hits)).tolist():
+            candidate = self.words[i]
+            distance = edit_distance(word, candidate, limit)
+            if distance > limit:
+                continue
+            if word in candidate or candidate in word:
+                return word
+            if len(word) < LONG_WORD and vowel_swap(word, candidate):
+                continue
+            rank = (distance, -self.frequencies[i], candidate)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = candidate, rank
+        return best
+
+    def normalize(self, query):
+        # Query with every correctable word replaced in place; unchanged text otherwise
+        return re.sub(r'\w+', lambda m: self._replace(m.group(0)), str(query))
+
+    def _replace(self, token):
+        lower = token.lower()
+        corrected = self.correct(lower)
+        return token if corrected == lower else corrected
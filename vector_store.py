@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+
+import numpy as np
+
+# --- ON-DISK VECTOR STORE ---
+# Layout of a store directory:
+#   vectors.npy  contiguous float32/float16 matrix (rows x dim)
+#   ids.npy      int64 row ids (position of each vector in scentsational_data.csv)
+#   hashes.npy   16-byte content hash of each row's text features (incremental builds)
+#   meta.json    header: model name, dimension, row count, dtype, source data hash
+# The .npy files are opened with mmap_mode='r', so every worker process shares
+# the same page cache instead of unpickling a private copy of the matrix.
+
+STORE_DIR = 'scent_store'
+STORE_FORMAT_VERSION = 1
+DEFAULT_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+VECTORS_FILE = 'vectors.npy'
+IDS_FILE = 'ids.npy'
+HASHES_FILE = 'hashes.npy'
+META_FILE = 'meta.json'
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def content_hashes(texts):
+    return np.array([hashlib.blake2b(str(t).encode('utf-8'), digest_size=16).digest() for t in texts], dtype='S16')
+
+
+def save_store(store_dir, embeddings, model_name=DEFAULT_MODEL_NAME, row_ids=None,
+               source_hash=None, dtype='float32', normalized=False, hashes=None, encoder='torch'):
+    if dtype not in ('float32', 'float16'):
+        raise ValueError(f"Unsupported store dtype: {dtype}")
+
+    vectors = np.ascontiguousarray(embeddings, dtype=dtype)
+    if vectors.ndim != 2:
+        raise ValueError(f"Embeddings must be a 2-D matrix, got shape {vectors.shape}")
+
+    os.makedirs(store_dir, exist_ok=True)
+    np.save(os.path.join(store_dir, VECTORS_FILE), vectors)
+    return finalize_store(store_dir, model_name=model_name, row_ids=row_ids, source_hash=source_hash,
+                          normalized=normalized, hashes=hashes, encoder=encoder)
+
+
+def create_vectors(store_dir, count, dim, dtype='float32'):
+    # Preallocated writable memmap for streaming builds; call finalize_store() when filled
+    if dtype not in ('float32', 'float16'):
+        raise ValueError(f"Unsupported store dtype: {dtype}")
+    os.makedirs(store_dir, exist_ok=True)
+    return np.lib.format.open_memmap(os.path.join(store_dir, VECTORS_FILE), mode='w+',
+                                     dtype=dtype, shape=(count, dim))
+
+
+def finalize_store(store_dir, model_name=DEFAULT_MODEL_NAME, row_ids=None, source_hash=None,
+                   normalized=False, hashes=None, encoder='torch'):
+    # Writes ids, hashes and the header for the vectors.npy already in store_dir
+    # encoder: encoders.ENCODER_BACKENDS entry that produced the vectors
+    vectors = np.load(os.path.join(store_dir, VECTORS_FILE), mmap_mode='r')
+    if row_ids is None:
+        row_ids = np.arange(len(vectors), dtype=np.int64)
+    row_ids = np.asarray(row_ids, dtype=np.int64)
+    if len(row_ids) != len(vectors):
+        raise ValueError("row_ids and embeddings have different lengths")
+
+    np.save(os.path.join(store_dir, IDS_FILE), row_ids)
+    if hashes is not None:
+        if len(hashes) != len(vectors):
+            raise ValueError("hashes and embeddings have different lengths")
+        np.save(os.path.join(store_dir, HASHES_FILE), np.asarray(hashes, dtype='S16'))
+
+    meta = {
+        'format_version': STORE_FORMAT_VERSION,
+        'model_name': model_name,
+        'encoder': encoder,
+        'dim': int(vectors.shape[1]),
+        'count': int(vectors.shape[0]),
+        'dtype': str(vectors.dtype),
+        'normalized': bool(normalized),
+        'source_hash': source_hash,
+    }
+    with open(os.path.join(store_dir, META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def read_meta(store_dir):
+    with open(os.path.join(store_dir, META_FILE)) as f:
+        meta = json.load(f)
+    if meta.get('format_version') != STORE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported store format version: {meta.get('format_version')}")
+    return meta
+
+
+def load_store(store_dir=STORE_DIR):
+    meta = read_meta(store_dir)
+    vectors = np.load(os.path.join(store_dir, VECTORS_FILE), mmap_mode='r')
+    row_ids = np.load(os.path.join(store_dir, IDS_FILE), mmap_mode='r')
+
+    if vectors.shape != (meta['count'], meta['dim']):
+        raise ValueError(f"Store header says {meta['count']}x{meta['dim']}, vectors are {vectors.shape}")
+    if len(row_ids) != meta['count']:
+        raise ValueError("Store ids do not match the vector count")
+    return vectors, row_ids, meta
+
+
+def load_hashes(store_dir=STORE_DIR):
+    # None for stores written before content hashes existed
+    path = os.path.join(store_dir, HASHES_FILE)
+    return np.load(path) if os.path.exists(path) else None
+
+
+def store_exists(store_dir=STORE_DIR):
+    return os.path.exists(os.path.join(store_dir, META_FILE))
+
+
+# --- ATOMIC REBUILDS ---
+# A build writes every file into a staging directory next to the store, renames
+# it to a versioned directory (scent_store.v<ns>) and points the store path at
+# it with a symlink swapped by os.replace(), so the store path never goes
+# missing. Readers never see a half-written store, and processes that already
+# memory-mapped the old files keep their inodes. The first publish over a plain
+# directory (stores built before versioned publishes, or filesystems without
+# symlinks) still moves it aside with two renames.
+def staging_dir(store_dir=STORE_DIR):
+    path = store_dir.rstrip('/\\') + '.building'
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    return path
+
+
+def resolve_store(store_dir=STORE_DIR):
+    # The version directory behind the store path, so one load reads one build
+    link = store_dir.rstrip('/\\')
+    return os.path.realpath(link) if os.path.islink(link) else store_dir
+
+
+def publish_store(staged, store_dir=STORE_DIR):
+    base = store_dir.rstrip('/\\')
+    previous = os.path.realpath(base) if os.path.islink(base) else None
+    version = f"{base}.v{time.time_ns()}"
+    os.rename(staged, version)
+    link = base + '.link'
+    if os.path.lexists(link):
+        os.remove(link)
+    try:
+        os.symlink(os.path.basename(version), link)
+    except OSError:
+        # No symlinks here: plain directory, swapped with two renames
+        os.rename(version, staged)
+        return _publish_by_rename(staged, base)
+    if os.path.isdir(base) and previous is None:
+        _publish_by_rename(link, base)
+    else:
+        os.replace(link, base)
+    if previous is not None and os.path.isdir(previous):
+        shutil.rmtree(previous)
+
+
+def _publish_by_rename(staged, store_dir):
+    retired = store_dir + '.old'
+    if os.path.exists(retired):
+        shutil.rmtree(retired)
+    if os.path.exists(store_dir):
+        os.rename(store_dir, retired)
+    os.rename(staged, store_dir)
+    if os.path.exists(retired):
+        shutil.rmtree(retired)
+
+
+# --- ONE-SHOT CONVERTER FROM THE LEGACY PICKLE ---
+def convert_pickle(pkl_path='scent_embeddings.pkl', store_dir=STORE_DIR,
+                   csv_path='scentsational_data.csv', model_name=DEFAULT_MODEL_NAME, dtype='float32'):
+    with open(pkl_path, 'rb') as f:
+        embeddings = pickle.load(f)
+    # Older builds may have pickled a torch tensor
+    if hasattr(embeddings, 'cpu'):
+        embeddings = embeddings.cpu().numpy()
+
+    # Cosine scores are unchanged by normalization, so store unit vectors once
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    meta = save_store(store_dir, embeddings / norms, model_name=model_name,
+                      source_hash=file_sha256(csv_path), dtype=dtype, normalized=True)
+    print(f"Converted '{pkl_path}' -> '{store_dir}/' ({meta['count']} x {meta['dim']}, {meta['dtype']}).")
+    return meta
+
+
+if __name__ == "__main__":
+    convert_pickle()